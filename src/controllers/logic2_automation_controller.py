@@ -1,19 +1,26 @@
-from typing import List, Optional, Dict
+import time
+from typing import List, Optional, Dict, Tuple
 from saleae.automation import Manager, LogicDeviceConfiguration, CaptureConfiguration, TimedCaptureMode, DeviceType
 
 class Logic2AutomationController:
     """Controller for managing Logic 2 automation device configurations and captures."""
+
+    __slots__ = ("manager", "_device_configs", "_capture_configs", "_devices_cache")
+
+    # Seconds a fetched device list is reused before asking Logic 2 again
+    DEVICES_CACHE_TTL = 1.0
     
-    def __init__(self, manager: Manager):
+    def __init__(self, manager: Optional[Manager]):
         """
         Initialize the Logic 2 automation controller.
         
         Args:
-            manager (Manager): Logic 2 automation manager instance
+            manager (Optional[Manager]): Logic 2 automation manager instance
         """
         self.manager = manager
         self._device_configs: Dict[str, LogicDeviceConfiguration] = {}
         self._capture_configs: Dict[str, CaptureConfiguration] = {}
+        self._devices_cache: Optional[Tuple[float, List[Dict]]] = None
         
     def create_device_config(self, 
                            name: str,
@@ -102,11 +109,17 @@ class Logic2AutomationController:
         """
         Get list of available Logic devices.
         
+        The list is cached for DEVICES_CACHE_TTL seconds, since devices only change on hot-plug.
+        
         Returns:
             List[Dict]: List of device information dictionaries with masked device IDs
         """
+        now = time.monotonic()
+        if self._devices_cache is not None and now - self._devices_cache[0] < self.DEVICES_CACHE_TTL:
+            return [dict(device) for device in self._devices_cache[1]]
+        
         devices = self.manager.get_devices()
-        return [
+        device_list = [
             {
                 'id': f"{device.device_id[:4]}...{device.device_id[-4:]}" if len(device.device_id) > 8 else "****",
                 'type': device.device_type,
@@ -114,6 +127,8 @@ class Logic2AutomationController:
             }
             for device in devices
         ]
+        self._devices_cache = (now, device_list)
+        return [dict(device) for device in device_list]
         
     def find_device_by_type(self, device_type: DeviceType) -> Optional[Dict]:
         """
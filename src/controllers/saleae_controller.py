@@ -1,29 +1,291 @@
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Union
+import csv
 import os
+import pathlib
+import select
+import shutil
 import time
 import logging
+import re
+import socket
+import stat
+import tempfile
+from contextlib import closing
+from itertools import groupby, islice
+from operator import itemgetter
 from saleae import Saleae, Trigger, PerformanceOption
-import psutil
 import subprocess
 # import pyautogui
 
 logger = logging.getLogger(__name__)
 
+# CSV layout for temporary digital exports: one 0/1 column per channel, a row only on changes
+_DIGITAL_CSV_EXPORT_ARGS = {'display_base': 'separate', 'rows_per_change': True}
+# Channel number at the end of an export column header, e.g. ' Channel 3'
+_CHANNEL_COLUMN_RE = re.compile(r'(\d+)\s*$')
+# Read buffer for temporary export files
+_EXPORT_READ_BUFFER_SIZE = 1 << 20
+# RAM-backed directory used for temporary exports when it has room to spare
+_SHM_DIR = '/dev/shm'
+_SHM_MIN_FREE_BYTES = 256 << 20
+# Logic 1.x scripting socket server, probed while the software starts up
+_LOGIC_API_ADDRESS = ('localhost', 10429)
+_LOGIC_STARTUP_TIMEOUT = 20.0
+# Trigger names accepted by configure_capture (python-saleae has no pulse trigger members)
+_TRIGGER_MAP = {
+    'high': Trigger.High,
+    'low': Trigger.Low,
+    'posedge': Trigger.Posedge,
+    'negedge': Trigger.Negedge
+}
+# PID of the last Logic.exe process found, checked before scanning the process table again
+_LOGIC_PID: Optional[int] = None
+
+def _transitions(samples, max_samples: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run-length encode (timestamp, value) string pairs from an export.
+
+    Only the first sample of each run of equal values is kept, so the result holds one
+    {'time', 'value'} entry per transition. If there are more than max_samples transitions
+    they are reduced to at most max_samples real transitions: the edges are split into
+    contiguous blocks, each keeping its first edge and its first high edge, so short pulses
+    stay visible. Edges that would repeat the previous value are dropped.
+    """
+    edges = [next(run) for _, run in groupby(samples, key=itemgetter(1))]
+    if max_samples is not None and len(edges) > max_samples:
+        block = -(-len(edges) // max(1, max_samples // 2))
+        kept = []
+        for start in range(0, len(edges), block):
+            first = edges[start]
+            for edge in (first, max(edges[start:start + block], key=itemgetter(1))):
+                if not kept or edge[1] != kept[-1][1]:
+                    kept.append(edge)
+        edges = kept[:max_samples]
+    return [{'time': float(timestamp), 'value': int(value)} for timestamp, value in edges]
+
+def _column_channels(header: Optional[List[str]], channels: List[int]) -> List[int]:
+    """
+    Return the channel number of each value column of an export, read from its header row.
+
+    Logic orders the columns itself rather than as the channels were requested, so they are
+    never matched up by position. An empty export without a header falls back to ascending
+    channel order.
+    """
+    if not header:
+        return sorted(set(channels))
+    column_channels = []
+    for name in header[1:]:
+        match = _CHANNEL_COLUMN_RE.search(name)
+        if match is None:
+            raise ValueError(f"Unexpected export column: {name!r}")
+        column_channels.append(int(match.group(1)))
+    return column_channels
+
+def _norm_path(path: str, cwd: Optional[str] = None) -> str:
+    """
+    Make a path absolute with forward slashes, as the Logic socket API expects.
+
+    Separators are converted by the platform's PurePath, so a backslash that is part of
+    a POSIX file name is left alone. Pass cwd to resolve several relative paths against
+    a single os.getcwd() call.
+    """
+    if cwd is not None:
+        path = os.path.join(cwd, path)
+    return pathlib.PurePath(os.path.abspath(path)).as_posix()
+
+def _temp_export_dir() -> str:
+    """
+    Directory for temporary Logic exports: SALEAE_TMPDIR if set, else /dev/shm when it is
+    writable and has room, else the system temp directory.
+    """
+    tmpdir = os.environ.get('SALEAE_TMPDIR')
+    if tmpdir:
+        return tmpdir
+    try:
+        if os.access(_SHM_DIR, os.W_OK) and shutil.disk_usage(_SHM_DIR).free >= _SHM_MIN_FREE_BYTES:
+            return _SHM_DIR
+    except OSError:
+        pass
+    return tempfile.gettempdir()
+
+def _temp_export_path(suffix: str = '.csv') -> str:
+    """
+    Reserve a uniquely named file for a temporary Logic export.
+
+    The file goes to _temp_export_dir() rather than next to the capture, so exports
+    stay off disk where possible and concurrent calls never collide.
+    """
+    tmp = tempfile.NamedTemporaryFile(
+        prefix='saleae_export_',
+        suffix=suffix,
+        dir=_temp_export_dir(),
+        delete=False
+    )
+    tmp.close()
+    return _norm_path(tmp.name)
+
+def _stat_and_ext(file_path: str) -> Tuple[Optional[os.stat_result], str]:
+    """Stat a file once, returning (stat result or None if it does not exist, extension)."""
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        st = None
+    return st, os.path.splitext(file_path)[1]
+
 class SaleaeController:
+    # Resolved Logic.exe path, shared across instances
+    _cached_saleae_path: Optional[str] = None
+    # Monotonic time of the last failed lookup; misses are trusted for SALEAE_PATH_MISS_TTL seconds
+    _saleae_path_miss: Optional[float] = None
+    SALEAE_PATH_MISS_TTL = 10.0
+
     def __init__(self):
         """Initialize the Saleae controller."""
         self.saleae = None
         self.connected_device = None
         self.sample_rate = None
         self.active_channels = None
+        self._ensured_dirs = set()
+        # Default directory for new captures
+        self._capture_dir = os.getcwd()
+        # (absolute path, mtime) of the capture currently open in Logic, and its active channels
+        self._loaded_capture: Optional[Tuple[str, float]] = None
+        self._loaded_channels = None
+        # Analyzer list reported by Logic, fetched once per connection
+        self._analyzers_cache = None
         
         # Try to connect
         if not self.connect():
             logger.error("Failed to initialize Saleae connection")
             # Don't raise exception here, let the caller handle it
 
+    def _ensure_dir(self, path: str) -> None:
+        """Create a directory if needed, remembering it so repeated exports skip the syscalls."""
+        if path in self._ensured_dirs:
+            return
+        os.makedirs(path, exist_ok=True)
+        self._ensured_dirs.add(path)
+
+    def _tune_socket(self) -> None:
+        """
+        Disable Nagle's algorithm on the python-saleae socket.
+
+        Every API call is a small request/response round trip, which Nagle and delayed
+        ACKs can stall by tens of milliseconds; also enlarge the receive buffer.
+        """
+        sock = getattr(self.saleae, '_s', None)
+        if not isinstance(sock, socket.socket):
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        except OSError as e:
+            logger.warning(f"Could not tune Logic socket options: {str(e)}")
+
+    def _client_alive(self) -> bool:
+        """
+        Check, without a round trip to Logic, that the python-saleae socket is still open.
+
+        When Logic exits or restarts, the old socket reads as EOF, which select reports as readable.
+        """
+        sock = getattr(self.saleae, '_s', None)
+        if not isinstance(sock, socket.socket):
+            return self.saleae is not None
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            return not readable or sock.recv(1, socket.MSG_PEEK) != b''
+        except (OSError, ValueError):
+            return False
+
+    def ensure_connected(self) -> bool:
+        """Reuse the current Logic connection while it is alive, reconnecting otherwise."""
+        if self.saleae is not None and self._client_alive():
+            return True
+        return self.connect()
+
+    def _invalidate_loaded(self) -> None:
+        """Forget the open capture after Logic loads or records something else."""
+        self._loaded_capture = None
+        self._loaded_channels = None
+
+    def _ensure_loaded(self, capture_file: str, st: Optional[os.stat_result] = None) -> None:
+        """
+        Load a capture file into Logic unless it is already open and unchanged.
+
+        Back-to-back calls on the same file skip the reload and re-index in Logic. Callers
+        that have already stat'ed the file can pass the result to avoid another stat.
+        """
+        path = os.path.abspath(capture_file)
+        try:
+            key = (path, (st or os.stat(path)).st_mtime)
+        except OSError:
+            key = None
+        if key is not None and key == self._loaded_capture:
+            logger.info(f"Capture file already loaded: {capture_file}")
+            return
+
+        self._invalidate_loaded()
+        logger.info(f"Loading capture file: {capture_file}")
+        self.saleae.load_from_file(capture_file)
+        self._wait_until_complete()
+        self._loaded_capture = key
+
+    def _get_active_channels(self):
+        """Return Logic's active (digital, analog) channels, memoized per loaded capture."""
+        if self._loaded_channels is None:
+            self._loaded_channels = self.saleae.get_active_channels()
+        return self._loaded_channels
+
+    def _wait_until_complete(self, timeout: Optional[float] = None,
+                             timeout_message: str = "Processing timed out") -> None:
+        """
+        Wait until Logic reports that processing is complete.
+
+        Polls with exponential back-off (2 ms doubling up to 100 ms) so short operations
+        return almost immediately while long ones do not flood the socket with requests.
+        Raises TimeoutError if timeout (seconds) elapses first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.002
+        while not self.saleae.is_processing_complete():
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(timeout_message)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def _wait_for_logic_api(self, process: subprocess.Popen,
+                            timeout: float = _LOGIC_STARTUP_TIMEOUT) -> bool:
+        """
+        Wait until the Logic scripting socket accepts connections.
+
+        Probes with exponential back-off instead of sleeping for a fixed time, and gives
+        up early if the launched process exits. Returns True once the port is reachable.
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while process.poll() is None:
+            try:
+                with socket.create_connection(_LOGIC_API_ADDRESS, timeout=0.2):
+                    return True
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        return False
+
     def _find_saleae_software(self) -> Optional[str]:
         """Find Saleae Logic software installation path."""
+        cached_path = SaleaeController._cached_saleae_path
+        if cached_path is not None and os.path.exists(cached_path):
+            return cached_path
+
+        last_miss = SaleaeController._saleae_path_miss
+        if last_miss is not None and time.monotonic() - last_miss < self.SALEAE_PATH_MISS_TTL:
+            logger.error("Saleae Logic software not found (cached result)")
+            return None
+
         # Common installation paths for Windows
         possible_paths = [
             # Logic 1 paths (older version)
@@ -36,25 +298,53 @@ class SaleaeController:
         ]
         
         for path in possible_paths:
-            if os.path.exists(path):
-                logger.info(f"Found Saleae Logic software at: {path}")
-                # Check permissions
-                try:
-                    if os.access(path, os.R_OK):
-                        logger.info(f"  ✓ File is readable")
-                    else:
-                        logger.warning(f"  ✗ File is not readable")
-                    if os.access(path, os.X_OK):
-                        logger.info(f"  ✓ File is executable")
-                    else:
-                        logger.warning(f"  ✗ File is not executable")
-                    return path
-                except Exception as e:
-                    logger.error(f"  ✗ Error checking permissions: {str(e)}")
+            # One stat per candidate covers both existence and permission bits
+            try:
+                mode = os.stat(path).st_mode
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error(f"  ✗ Error checking permissions for {path}: {str(e)}")
+                continue
+
+            logger.info(f"Found Saleae Logic software at: {path}")
+            if mode & stat.S_IRUSR:
+                logger.info(f"  ✓ File is readable")
+            else:
+                logger.warning(f"  ✗ File is not readable")
+            if mode & stat.S_IXUSR:
+                logger.info(f"  ✓ File is executable")
+            else:
+                logger.warning(f"  ✗ File is not executable")
+            SaleaeController._cached_saleae_path = path
+            SaleaeController._saleae_path_miss = None
+            return path
                     
         logger.error("Saleae Logic software not found in common installation paths")
+        SaleaeController._saleae_path_miss = time.monotonic()
         return None
 
+    def _is_logic_running(self) -> bool:
+        """Check whether Logic.exe is running, trying the last known PID before a full scan."""
+        # psutil is only needed when Logic has to be found or launched
+        import psutil
+
+        global _LOGIC_PID
+        if _LOGIC_PID is not None:
+            try:
+                if 'Logic.exe' in psutil.Process(_LOGIC_PID).name():
+                    return True
+            except psutil.Error:
+                pass
+
+        for proc in psutil.process_iter(['name']):
+            if 'Logic.exe' in (proc.info['name'] or ''):
+                _LOGIC_PID = proc.pid
+                return True
+
+        _LOGIC_PID = None
+        return False
+
     def _launch_saleae_software(self) -> bool:
         """Launch Saleae Logic software if not running."""
         try:
@@ -63,10 +353,9 @@ class SaleaeController:
                 return False
                 
             # Check if process is already running
-            for proc in psutil.process_iter(['name']):
-                if 'Logic.exe' in proc.info['name']:
-                    logger.info("Saleae Logic software is already running")
-                    return True
+            if self._is_logic_running():
+                logger.info("Saleae Logic software is already running")
+                return True
                     
             # Launch the software with elevated privileges
             logger.info(f"Launching Saleae Logic from: {saleae_path}")
@@ -84,14 +373,14 @@ class SaleaeController:
             else:
                 process = subprocess.Popen([saleae_path])
                 
-            # Wait for initial startup
-            time.sleep(5)
+            # Wait for the scripting socket server to come up
+            if self._wait_for_logic_api(process):
+                logger.info("Saleae Logic is accepting connections")
+                return True
             
             # Verify process is running
             if process.poll() is None:
-                logger.info("Saleae Logic process is running")
-                # Wait for Logic to initialize
-                time.sleep(10)  # Give more time for Logic to fully initialize
+                logger.warning("Saleae Logic process is running but its socket server is not reachable yet")
                 return True
             else:
                 logger.error("Saleae Logic process exited immediately")
@@ -106,9 +395,16 @@ class SaleaeController:
         Connect to Saleae Logic software.
         If connection fails, it attempts to launch the software and retry connection.
         """
+        # A new client may be talking to a restarted Logic, or one the user has since opened
+        # another file in, so forget everything cached from the old connection
+        self._analyzers_cache = None
+        self._invalidate_loaded()
+        self.saleae = None
         try:
             # First attempt to connect to an already running instance
             self.saleae = Saleae()
+            self._tune_socket()
+            SaleaeController._saleae_path_miss = None
             logger.info("Successfully connected to an existing Saleae Logic instance.")
             self.connected_device = self.saleae.get_active_device()
             return True
@@ -120,9 +416,8 @@ class SaleaeController:
                 logger.info("Saleae Logic software launched. Retrying connection...")
                 # Retry connection after launching
                 try:
-                    # Give it a moment to initialize the server socket
-                    time.sleep(2) 
                     self.saleae = Saleae()
+                    self._tune_socket()
                     logger.info("Successfully connected to Saleae Logic after launching.")
                     self.connected_device = self.saleae.get_active_device()
                     return True
@@ -154,16 +449,9 @@ class SaleaeController:
             
             # Set trigger if specified
             if trigger_channel is not None and trigger_type is not None:
-                trigger_map = {
-                    'high': Trigger.High,
-                    'low': Trigger.Low,
-                    'posedge': Trigger.Posedge,
-                    'negedge': Trigger.Negedge,
-                    'pospulse': Trigger.Pospulse,
-                    'negpulse': Trigger.Negpulse
-                }
-                if trigger_type.lower() in trigger_map:
-                    self.saleae.set_trigger_one_channel(trigger_channel, trigger_map[trigger_type.lower()])
+                trigger = _TRIGGER_MAP.get(trigger_type.lower())
+                if trigger is not None:
+                    self.saleae.set_trigger_one_channel(trigger_channel, trigger)
             
             # Store current configuration
             self.active_channels = (digital_channels, analog_channels or [])
@@ -177,12 +465,12 @@ class SaleaeController:
     def parse_capture(self, file_path: str) -> Dict[str, Any]:
         """Parse a capture file and return its contents."""
         try:
-            if not os.path.exists(file_path):
+            st, ext = _stat_and_ext(file_path)
+            if st is None:
                 logger.error(f"Capture file not found: {file_path}")
                 return {"status": "error", "message": "File not found"}
 
             # Check file extension
-            _, ext = os.path.splitext(file_path)
             if ext.lower() == '.logicdata':
                 logger.info(f"Found Logic 1.x capture file: {file_path}")
                 # For Logic 1.x, we can't parse the file programmatically
@@ -192,9 +480,9 @@ class SaleaeController:
                     "message": "File exists, please open in Logic software",
                     "file_type": "logicdata",
                     "file_path": file_path,
-                    "file_size": os.path.getsize(file_path),
-                    "created": time.ctime(os.path.getctime(file_path)),
-                    "modified": time.ctime(os.path.getmtime(file_path))
+                    "file_size": st.st_size,
+                    "created": time.ctime(st.st_ctime),
+                    "modified": time.ctime(st.st_mtime)
                 }
             else:
                 logger.error(f"Unsupported file format: {ext}")
@@ -215,12 +503,12 @@ class SaleaeController:
     def load_capture(self, file_path: str) -> bool:
         """Load a capture file."""
         try:
-            if not os.path.exists(file_path):
+            st, ext = _stat_and_ext(file_path)
+            if st is None:
                 logger.error(f"Capture file not found: {file_path}")
                 return False
                 
             # Check file extension
-            _, ext = os.path.splitext(file_path)
             if ext.lower() == '.logicdata':
                 logger.info(f"Found Logic 1.x capture file: {file_path}")
                 logger.info("Please open the file manually in Saleae Logic software")
@@ -233,8 +521,8 @@ class SaleaeController:
             logger.error(f"Failed to load capture: {str(e)}")
             return False
 
-    def start_capture(self, duration_seconds: float) -> bool:
-        """Start a capture for specified duration."""
+    def start_capture(self, duration_seconds: float, capture_dir: Optional[str] = None) -> bool:
+        """Start a capture for specified duration, saved in capture_dir (default: the startup directory)."""
         try:
             # Verify connection is still active
             if not hasattr(self, 'saleae') or self.saleae is None:
@@ -243,7 +531,7 @@ class SaleaeController:
                 
             # Create a unique filename with timestamp
             timestamp = time.strftime("%Y%m%d-%H%M%S")
-            capture_file = os.path.join(os.getcwd(), f"capture_{timestamp}.logicdata")
+            capture_file = os.path.join(capture_dir or self._capture_dir, f"capture_{timestamp}.logicdata")
             
             # Set capture duration
             logger.info(f"Setting capture duration to {duration_seconds} seconds...")
@@ -251,11 +539,11 @@ class SaleaeController:
             
             # Start capture to file
             logger.info(f"Starting capture, saving to {capture_file}...")
+            self._invalidate_loaded()
             self.saleae.capture_to_file(capture_file)
             
             # Wait for processing to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
+            self._wait_until_complete()
                 
             logger.info("Capture completed successfully")
             return True
@@ -286,13 +574,12 @@ class SaleaeController:
         """Convert .sal file to .logicdata format using Saleae API."""
         try:
             # Ensure paths are absolute and use forward slashes
-            sal_file = os.path.abspath(sal_file).replace('\\', '/')
-            logicdata_file = os.path.abspath(logicdata_file).replace('\\', '/')
+            cwd = os.getcwd()
+            sal_file = _norm_path(sal_file, cwd)
+            logicdata_file = _norm_path(logicdata_file, cwd)
             
             # Ensure output directory exists
-            output_dir = os.path.dirname(logicdata_file)
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+            self._ensure_dir(os.path.dirname(logicdata_file))
             
             logger.info(f"Converting {sal_file} to {logicdata_file}")
             
@@ -307,6 +594,7 @@ class SaleaeController:
             # Open the .sal file
             try:
                 logger.info("Attempting to load .sal file...")
+                self._invalidate_loaded()
                 self.saleae.load_from_file(sal_file)
                 logger.info("File load command sent")
             except Exception as e:
@@ -314,13 +602,8 @@ class SaleaeController:
                 raise RuntimeError(f"Failed to load .sal file: {e}")
             
             # Wait for loading with timeout
-            load_timeout = 30  # seconds
-            start_time = time.time()
             try:
-                while not self.saleae.is_processing_complete():
-                    if time.time() - start_time > load_timeout:
-                        raise TimeoutError("Loading .sal file timed out")
-                    time.sleep(0.1)
+                self._wait_until_complete(30, "Loading .sal file timed out")
                 logger.info("File loading completed")
             except Exception as e:
                 logger.error(f"Error while waiting for file to load: {e}")
@@ -328,7 +611,7 @@ class SaleaeController:
             
             # Get active channels
             try:
-                active_channels = self.saleae.get_active_channels()
+                active_channels = self._get_active_channels()
                 logger.info(f"Active channels: {active_channels}")
                 if not active_channels or (not active_channels[0] and not active_channels[1]):
                     raise ValueError("No active channels found in the file")
@@ -351,13 +634,8 @@ class SaleaeController:
                 raise RuntimeError(f"Failed to start export: {e}")
             
             # Wait for export with timeout
-            export_timeout = 30  # seconds
-            start_time = time.time()
             try:
-                while not self.saleae.is_processing_complete():
-                    if time.time() - start_time > export_timeout:
-                        raise TimeoutError("Export to .logicdata timed out")
-                    time.sleep(0.1)
+                self._wait_until_complete(30, "Export to .logicdata timed out")
                 logger.info("Export completed")
             except Exception as e:
                 logger.error(f"Error while waiting for export to complete: {e}")
@@ -391,8 +669,9 @@ class SaleaeController:
                    time_span: Optional[List[float]] = None) -> Dict[str, Any]:
         """Export capture data to specified format."""
         try:
-            # Verify input file exists
-            if not os.path.exists(input_file):
+            # Verify input file exists (the stat is reused for the .sal size check)
+            input_stat, _ = _stat_and_ext(input_file)
+            if input_stat is None:
                 logger.error(f"Input file not found: {input_file}")
                 return {
                     "status": "error",
@@ -401,11 +680,12 @@ class SaleaeController:
                 }
 
             # Prepare paths
-            input_file = os.path.abspath(input_file).replace('\\', '/')
-            output_file = os.path.abspath(output_file).replace('\\', '/')
+            cwd = os.getcwd()
+            input_file = _norm_path(input_file, cwd)
+            output_file = _norm_path(output_file, cwd)
 
-            # Ensure we're connected to Logic
-            if not self.connect():
+            # Ensure we're connected to Logic, reusing a live connection
+            if not self.ensure_connected():
                 return {
                     "status": "error",
                     "message": "Failed to connect to Logic",
@@ -417,12 +697,14 @@ class SaleaeController:
                 logger.info(f"Converting .sal file to .logicdata format")
                 temp_logicdata = os.path.splitext(input_file)[0] + '.logicdata'
                 try:
-                    # Check if file is accessible
-                    if not os.access(input_file, os.R_OK):
-                        raise PermissionError(f"No read permission for file: {input_file}")
+                    # Check if file is accessible by opening it, which honours ACLs unlike os.access
+                    try:
+                        open(input_file, 'rb').close()
+                    except PermissionError:
+                        raise PermissionError(f"No read permission for file: {input_file}") from None
                     
                     # Check file size
-                    file_size = os.path.getsize(input_file)
+                    file_size = input_stat.st_size
                     if file_size == 0:
                         raise ValueError(f"File is empty: {input_file}")
                     
@@ -480,20 +762,14 @@ class SaleaeController:
                     }
 
             # Ensure output directory exists
-            output_dir = os.path.dirname(output_file)
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-                logger.info(f"Created output directory: {output_dir}")
+            self._ensure_dir(os.path.dirname(output_file))
 
             # Load the file
-            logger.info(f"Loading capture file: {input_file}")
-            self.saleae.load_from_file(input_file)
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
+            self._ensure_loaded(input_file)
 
             # Get channels if not provided
             if digital_channels is None or analog_channels is None:
-                active_channels = self.saleae.get_active_channels()
+                active_channels = self._get_active_channels()
                 digital_channels = digital_channels or active_channels[0]
                 analog_channels = analog_channels or active_channels[1]
 
@@ -508,12 +784,7 @@ class SaleaeController:
                     format=format
                 )
                 # Wait for export to complete
-                export_timeout = 30  # seconds
-                start_time = time.time()
-                while not self.saleae.is_processing_complete():
-                    if time.time() - start_time > export_timeout:
-                        raise TimeoutError("Export operation timed out")
-                    time.sleep(0.1)
+                self._wait_until_complete(30, "Export operation timed out")
             except Exception as e:
                 logger.error(f"Export failed: {e}")
                 return {
@@ -553,7 +824,7 @@ class SaleaeController:
         """Get information about the connected device."""
         try:
             device = self.saleae.get_active_device()
-            digital_channels, analog_channels = self.saleae.get_active_channels()
+            digital_channels, analog_channels = self._get_active_channels()
             sample_rate = self.saleae.get_sample_rate()
             
             return {
@@ -582,15 +853,10 @@ class SaleaeController:
                         start_time: Optional[float] = None,
                         end_time: Optional[float] = None,
                         max_samples: Optional[int] = None) -> Dict[str, Any]:
-        """Get digital data from a capture file."""
+        """Get digital data from a capture file, as one entry per transition."""
         try:
             # Load the capture file
-            logger.info(f"Loading capture file: {capture_file}")
-            self.saleae.load_from_file(capture_file)
-            
-            # Wait for processing to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
+            self._ensure_loaded(capture_file)
 
             # Convert time span if provided
             time_span = None
@@ -598,40 +864,29 @@ class SaleaeController:
                 time_span = [start_time, end_time]
 
             # Create a temporary CSV file
-            temp_csv = os.path.splitext(capture_file)[0] + "_temp.csv"
-            
-            # Export digital data to CSV
-            logger.info("Exporting digital data to CSV...")
-            self.saleae.export_data2(
-                temp_csv,
-                digital_channels=[channel],
-                time_span=time_span,
-                format='csv'
-            )
-            
-            # Wait for export to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
-            
-            # Read and parse the exported data
-            digital_data = []
-            with open(temp_csv, 'r') as f:
-                # Skip header
-                next(f)
-                for line in f:
-                    timestamp, value = line.strip().split(',')
-                    digital_data.append({
-                        'time': float(timestamp),
-                        'value': int(value)
-                    })
-            
-            # Clean up temp file
-            os.remove(temp_csv)
-            
-            # Apply max_samples if specified
-            if max_samples is not None and len(digital_data) > max_samples:
-                step = len(digital_data) // max_samples
-                digital_data = digital_data[::step]
+            temp_csv = _temp_export_path()
+            try:
+                # Export digital data to CSV
+                logger.info("Exporting digital data to CSV...")
+                self.saleae.export_data2(
+                    temp_csv,
+                    digital_channels=[channel],
+                    time_span=time_span,
+                    format='csv',
+                    **_DIGITAL_CSV_EXPORT_ARGS
+                )
+                # export_data2 returns once Logic has ACKed the finished export
+                
+                # Read and parse the exported data (csv.reader tokenizes in C)
+                with open(temp_csv, 'r', newline='', buffering=_EXPORT_READ_BUFFER_SIZE) as f:
+                    reader = csv.reader(f)
+                    # Skip header
+                    next(reader, None)
+                    digital_data = _transitions(reader, max_samples)
+            finally:
+                # Clean up temp file, which exists even if the export failed
+                if os.path.exists(temp_csv):
+                    os.remove(temp_csv)
             
             logger.info("Successfully got digital data")
             return {
@@ -653,62 +908,56 @@ class SaleaeController:
                              start_time: Optional[float] = None,
                              end_time: Optional[float] = None,
                              max_samples: Optional[int] = None) -> Dict[str, Any]:
-        """Get digital data from multiple channels in a capture file."""
+        """
+        Get digital data from multiple channels in a capture file, as one entry per transition.
+        """
         try:
             # Load the capture file
-            logger.info(f"Loading capture file: {capture_file}")
-            self.saleae.load_from_file(capture_file)
-            
-            # Wait for processing to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
+            self._ensure_loaded(capture_file)
 
             # Convert time span if provided
             time_span = None
             if start_time is not None and end_time is not None:
                 time_span = [start_time, end_time]
 
+            # Each channel is exported and reported once, in the order first requested
+            channels = list(dict.fromkeys(channels))
+
             # Create a temporary CSV file
-            temp_csv = os.path.splitext(capture_file)[0] + "_temp.csv"
-            
-            # Export digital data to CSV
-            logger.info("Exporting digital data to CSV...")
-            self.saleae.export_data2(
-                temp_csv,
-                digital_channels=channels,
-                time_span=time_span,
-                format='csv'
-            )
-            
-            # Wait for export to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
-            
-            # Read and parse the exported data
-            channel_data = {}
-            with open(temp_csv, 'r') as f:
-                # Skip header
-                next(f)
-                for line in f:
-                    timestamp, *values = line.strip().split(',')
-                    for i, value in enumerate(values):
-                        channel = channels[i]
-                        if channel not in channel_data:
-                            channel_data[channel] = []
-                        channel_data[channel].append({
-                            'time': float(timestamp),
-                            'value': int(value)
-                        })
-            
-            # Clean up temp file
-            os.remove(temp_csv)
+            temp_csv = _temp_export_path()
+            try:
+                # Export digital data to CSV
+                logger.info("Exporting digital data to CSV...")
+                self.saleae.export_data2(
+                    temp_csv,
+                    digital_channels=channels,
+                    time_span=time_span,
+                    format='csv',
+                    **_DIGITAL_CSV_EXPORT_ARGS
+                )
+                # export_data2 returns once Logic has ACKed the finished export
+                
+                # Read and parse the exported data (csv.reader tokenizes in C)
+                with open(temp_csv, 'r', newline='', buffering=_EXPORT_READ_BUFFER_SIZE) as f:
+                    reader = csv.reader(f)
+                    # The header says which channel each column holds
+                    column_channels = _column_channels(next(reader, None), channels)
+                    # Transpose rows into columns in a single C-level pass
+                    columns = list(zip(*reader, strict=True)) or [()] * (len(column_channels) + 1)
+            finally:
+                # Clean up temp file, which exists even if the export failed
+                if os.path.exists(temp_csv):
+                    os.remove(temp_csv)
             
-            # Apply max_samples if specified
-            if max_samples is not None:
-                for channel in channel_data:
-                    if len(channel_data[channel]) > max_samples:
-                        step = len(channel_data[channel]) // max_samples
-                        channel_data[channel] = channel_data[channel][::step]
+            # Rows are emitted when any channel changes; keep only each channel's own transitions
+            times = columns[0]
+            column_of = {channel: column for column, channel in enumerate(column_channels, start=1)}
+            channel_data = {
+                channel: _transitions(
+                    zip(times, columns[column_of[channel]], strict=True), max_samples
+                )
+                for channel in channels
+            }
             
             logger.info("Successfully got digital data for all channels")
             return {
@@ -727,21 +976,20 @@ class SaleaeController:
     def detect_protocols(self, file_path: str) -> Dict[str, Any]:
         """Detect protocols in a capture file."""
         try:
-            if not os.path.exists(file_path):
+            st, ext = _stat_and_ext(file_path)
+            if st is None:
                 logger.error(f"Capture file not found: {file_path}")
                 return {"status": "error", "message": "File not found"}
 
             # Check file extension
-            _, ext = os.path.splitext(file_path)
             if ext.lower() == '.logicdata':
                 logger.info(f"Found Logic 1.x capture file: {file_path}")
                 
                 try:
-                    # First, try to open the file in Logic
+                    # First, try to open the file in Logic (skipped if it is already open)
                     logger.info("Opening capture file in Logic...")
                     try:
-                        # Try to open the file using the Saleae API
-                        self.saleae.open_capture_file(file_path)
+                        self._ensure_loaded(file_path, st)
                         logger.info("Successfully opened capture file")
                     except Exception as e:
                         logger.warning(f"Could not open file via API: {str(e)}")
@@ -752,11 +1000,10 @@ class SaleaeController:
                             "file_path": file_path
                         }
                     
-                    # Wait for file to load
-                    time.sleep(2)
-                    
-                    # Get available analyzers
-                    analyzers = self.saleae.get_available_analyzers()
+                    # Get available analyzers (static for a given Logic instance)
+                    if self._analyzers_cache is None:
+                        self._analyzers_cache = self.saleae.get_available_analyzers()
+                    analyzers = self._analyzers_cache
                     logger.info(f"Available analyzers: {analyzers}")
                     
                     # Try to detect protocols
@@ -802,128 +1049,176 @@ class SaleaeController:
                 "file_path": file_path
             }
 
-    def get_digital_data_mcp(self, 
-                           input_file: str,
-                           digital_channels: Optional[List[int]] = None,
-                           time_span: Optional[List[float]] = None) -> Dict[str, Any]:
-        """Get digital data from a capture file."""
+    def iter_digital_data_mcp(self,
+                              input_file: str,
+                              digital_channels: Optional[List[int]] = None,
+                              time_span: Optional[List[float]] = None,
+                              chunk_size: int = 100_000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream digital data from a capture file in chunks of at most chunk_size rows.
+
+        Yields {'status': 'chunk', 'i0', 'i1', 'time': [...], 'channels': {channel: [...]}}
+        dicts covering rows i0..i1-1, so memory stays bounded by the chunk size. If anything
+        fails, a single {'status': 'error', ...} dict is yielded and iteration stops.
+        """
         try:
-            # Verify input file exists
-            if not os.path.exists(input_file):
+            # Verify input file exists (the stat is reused when loading it)
+            st, ext = _stat_and_ext(input_file)
+            if st is None:
                 logger.error(f"Input file not found: {input_file}")
-                return {
+                yield {
                     "status": "error",
                     "message": "Input file not found",
                     "details": f"File does not exist: {input_file}"
                 }
+                return
 
             # Verify file extension
-            if not input_file.lower().endswith(('.logicdata')):
+            if ext.lower() != '.logicdata':
                 logger.error(f"Invalid file extension: {input_file}")
-                return {
+                yield {
                     "status": "error",
                     "message": "Invalid file extension",
                     "details": "File must have .logicdata extension"
                 }
+                return
 
-            # Ensure we're connected to Logic
-            if not self.connect():
-                return {
+            # Ensure we're connected to Logic, reusing a live connection
+            if not self.ensure_connected():
+                yield {
                     "status": "error",
                     "message": "Failed to connect to Logic",
                     "details": "Please make sure Logic software is running and try again"
                 }
+                return
 
-            # First, try to open the file in Logic
+            # First, try to open the file in Logic (skipped if it is already open)
             logger.info(f"Opening capture file in Logic: {input_file}")
             try:
-                # Convert path to forward slashes and make it absolute
-                input_file = os.path.abspath(input_file).replace('\\', '/')
+                # Absolute, forward-slashed path for Logic; input_file stays as given for messages
+                input_path = _norm_path(input_file)
                 
-                logger.info(f"Loading file: {input_file}")
-                self.saleae.load_from_file(input_file)
+                self._ensure_loaded(input_path, st)
                 logger.info("Successfully opened capture file")
                 
             except Exception as e:
                 error_type = type(e).__name__
                 error_msg = str(e)
                 logger.error(f"Failed to open file: {error_type}: {error_msg}")
-                return {
+                yield {
                     "status": "error",
                     "message": "Failed to open file",
                     "details": f"{error_type}: {error_msg}"
                 }
-            
-            # Wait for file to load
-            logger.info("Waiting for file to load...")
-            time.sleep(2)
-            
-            # Wait for processing to complete
-            try:
-                logger.info("Waiting for processing to complete...")
-                while not self.saleae.is_processing_complete():
-                    time.sleep(0.1)
-                logger.info("Processing completed")
-            except Exception as e:
-                logger.error(f"Error waiting for processing: {str(e)}")
-                return {
-                    "status": "error",
-                    "message": "Failed to process file",
-                    "details": str(e)
-                }
+                return
             
             # Get digital data
+            logger.info("Getting digital data...")
+            if digital_channels is None:
+                digital_channels = self._get_active_channels()[0]
+            
+            # Create a temporary CSV file
+            temp_csv = _temp_export_path()
             try:
-                logger.info("Getting digital data...")
-                # Create a temporary CSV file
-                temp_csv = os.path.splitext(input_file)[0] + "_temp.csv"
-                
                 # Export digital data to CSV
                 self.saleae.export_data2(
                     temp_csv,
                     digital_channels=digital_channels,
                     time_span=time_span,
-                    format='csv'
+                    format='csv',
+                    **_DIGITAL_CSV_EXPORT_ARGS
                 )
+                # export_data2 returns once Logic has ACKed the finished export
                 
-                # Wait for export to complete
-                while not self.saleae.is_processing_complete():
-                    time.sleep(0.1)
-                
-                # Read and parse the exported data
-                digital_data = []
-                with open(temp_csv, 'r') as f:
-                    # Skip header
-                    next(f)
-                    for line in f:
-                        timestamp, value = line.strip().split(',')
-                        digital_data.append({
-                            'time': float(timestamp),
-                            'value': int(value)
-                        })
-                
-                # Clean up temp file
-                os.remove(temp_csv)
-                
-                logger.info("Successfully got digital data")
-                return {
-                    "status": "success",
-                    "message": "Successfully got digital data",
-                    "data": digital_data
-                }
+                # Read the export a chunk of rows at a time, parsing each chunk column-wise
+                with open(temp_csv, 'r', newline='', buffering=_EXPORT_READ_BUFFER_SIZE) as f:
+                    reader = csv.reader(f)
+                    # The header says which channel each column holds
+                    column_channels = _column_channels(next(reader, None), digital_channels)
+                    i0 = 0
+                    while True:
+                        rows = list(islice(reader, chunk_size))
+                        if not rows:
+                            break
+                        columns = list(zip(*rows, strict=True))
+                        yield {
+                            "status": "chunk",
+                            "i0": i0,
+                            "i1": i0 + len(rows),
+                            "time": list(map(float, columns[0])),
+                            "channels": {
+                                channel: list(map(int, columns[column]))
+                                for column, channel in enumerate(column_channels, start=1)
+                            }
+                        }
+                        i0 += len(rows)
             except Exception as e:
                 logger.error(f"Error getting digital data: {str(e)}")
-                return {
+                yield {
                     "status": "error",
                     "message": "Failed to get digital data",
                     "details": str(e)
                 }
+                return
+            finally:
+                # Clean up temp file
+                if os.path.exists(temp_csv):
+                    os.remove(temp_csv)
+            
+            logger.info("Successfully got digital data")
         except Exception as e:
             error_type = type(e).__name__
             error_msg = str(e)
             logger.error(f"Failed to get digital data: {error_type}: {error_msg}")
-            return {
+            yield {
                 "status": "error",
                 "message": "Failed to get digital data",
                 "details": f"{error_type}: {error_msg}"
-            } 
\ No newline at end of file
+            }
+
+    def get_digital_data_mcp(self, 
+                           input_file: str,
+                           digital_channels: Optional[List[int]] = None,
+                           time_span: Optional[List[float]] = None,
+                           offset: int = 0,
+                           max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get a page of digital data from a capture file.
+
+        Returns exported rows offset..offset+max_rows-1 column-wise as
+        {'time': [...], 'channels': {channel: [...]}}. This replaces the earlier list of
+        {'time', 'value'} dicts, one per row. Only the requested page is held in memory;
+        with max_rows=None every row from offset on is collected. next_offset is the offset
+        of the following page, or None once the export is exhausted.
+        """
+        digital_data = {'time': [], 'channels': {}}
+        next_offset = None
+        chunk_size = 100_000 if max_rows is None else max(1, min(max_rows, 100_000))
+        # Closing the generator early stops the read and removes the temporary export
+        with closing(self.iter_digital_data_mcp(input_file, digital_channels, time_span,
+                                                chunk_size)) as chunks:
+            for chunk in chunks:
+                if chunk['status'] != 'chunk':
+                    return chunk
+                if chunk['i1'] <= offset:
+                    continue
+                if max_rows is not None and len(digital_data['time']) >= max_rows:
+                    # A further row exists, so there is another page
+                    next_offset = offset + max_rows
+                    break
+                lo = max(offset - chunk['i0'], 0)
+                hi = None if max_rows is None else lo + max_rows - len(digital_data['time'])
+                digital_data['time'].extend(chunk['time'][lo:hi])
+                for channel, values in chunk['channels'].items():
+                    digital_data['channels'].setdefault(channel, []).extend(values[lo:hi])
+                if hi is not None and hi < len(chunk['time']):
+                    next_offset = offset + max_rows
+                    break
+
+        return {
+            "status": "success",
+            "message": "Successfully got digital data",
+            "data": digital_data,
+            "offset": offset,
+            "next_offset": next_offset
+        }
@@ -1,17 +1,137 @@
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Union, Any, Tuple, Literal
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from itertools import groupby
+from operator import itemgetter
 from mcp.server.fastmcp import FastMCP
 from saleae import Saleae
 from saleae.automation import Manager, Capture
+import array
+import base64
+import csv
+import socket
+import sys
 import time
 import os
 import logging
-import json
+import tempfile
+import threading
+from .saleae_controller import (
+    _EXPORT_READ_BUFFER_SIZE,
+    _LOGIC_API_ADDRESS,
+    _LOGIC_STARTUP_TIMEOUT,
+    _column_channels,
+    _temp_export_dir,
+)
 
 logger = logging.getLogger(__name__)
 
+# python-saleae CSV settings for the temporary exports: a time column plus one value column
+_DIGITAL_CSV_ARGS = {
+    'column_headers': True,
+    'timestamp': 'time_stamp',
+    'display_base': 'separate',
+    'rows_per_change': True,
+}
+_ANALOG_CSV_ARGS = {'column_headers': True, 'analog_format': 'voltage'}
+# value type, CSV settings and temp file prefix for each kind of channel export
+_CHANNEL_EXPORTS = {
+    'digital': (int, _DIGITAL_CSV_ARGS, 'sal_dig_'),
+    'analog': (float, _ANALOG_CSV_ARGS, 'sal_ana_'),
+}
+# array typecode and dtype name of the values in return_format='packed'
+_PACKED_VALUES = {
+    'digital': ('b', 'int8'),
+    'analog': ('d', 'float64'),
+}
+
+def _logic_socket_up(timeout: float = 0.05) -> bool:
+    """Return True if the Logic 1.x scripting socket accepts a connection within timeout seconds."""
+    try:
+        with socket.create_connection(_LOGIC_API_ADDRESS, timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def _export_time_span(start_time: Optional[float], end_time: Optional[float]) -> Optional[List[float]]:
+    """Return the export_data2 time_span for a fully bounded window, or None to export all time."""
+    if start_time is None or end_time is None:
+        return None
+    return [start_time, end_time]
+
+def _temp_export_path(prefix: str) -> str:
+    """Create a unique temporary export file, preferably in RAM-backed storage, and return its path."""
+    with tempfile.NamedTemporaryFile(prefix=prefix, suffix='.csv', dir=_temp_export_dir(), delete=False) as tmp:
+        return tmp.name
+
+def _remove_quietly(path: str) -> None:
+    """Remove a temporary export, ignoring files that are already gone."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def _read_csv_window(path: str,
+                     value_type: type,
+                     start_time: Optional[float],
+                     end_time: Optional[float],
+                     channels: List[int]) -> Tuple[List[float], Dict[int, List[Any]]]:
+    """
+    Read a temporary (time, value, ...) export of channels and return the time column and
+    each channel's value column, restricted to [start_time, end_time]. Columns are matched
+    to channels by the export's header.
+    
+    csv.reader tokenizes in C and the columns are converted with map(). Exports are sorted
+    by time, so the window is found by binary search and only its values are converted.
+    """
+    with open(path, 'r', newline='', buffering=_EXPORT_READ_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        column_channels = _column_channels(next(reader, None), channels)
+        columns = list(zip(*reader, strict=True)) or [()] * (len(column_channels) + 1)
+    times = list(map(float, columns[0]))
+    
+    i0 = 0 if start_time is None else bisect_left(times, start_time)
+    i1 = len(times) if end_time is None else bisect_right(times, end_time)
+    if i0 > 0 or i1 < len(times):
+        times = times[i0:i1]
+    return times, {
+        channel: list(map(value_type, column[i0:i1]))
+        for channel, column in zip(column_channels, columns[1:], strict=True)
+    }
+
+def _channel_changes(times: List[float], values: List[int]) -> Dict[str, List[Any]]:
+    """Keep only the rows of a combined export where this channel's value changes."""
+    edges = [next(run) for _, run in groupby(zip(times, values, strict=True), itemgetter(1))]
+    return {'time': [t for t, _ in edges], 'value': [v for _, v in edges]}
+
+def _to_records(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Convert {'time': [...], 'value': [...]} into the legacy [{'time': t, 'value': v}, ...] form."""
+    return [{'time': t, 'value': v} for t, v in zip(columns['time'], columns['value'], strict=True)]
+
+def _to_packed(columns: Dict[str, List[Any]], kind: str) -> Dict[str, Any]:
+    """
+    Pack {'time': [...], 'value': [...]} into base64 encoded native arrays.
+    
+    Clients decode a column with e.g. numpy.frombuffer(base64.b64decode(data['time']), dtype='float64'),
+    swapping bytes if data['byteorder'] differs from their own.
+    """
+    typecode, dtype = _PACKED_VALUES[kind]
+    return {
+        'dtype': {'time': 'float64', 'value': dtype},
+        'byteorder': sys.byteorder,
+        'length': len(columns['time']),
+        'time': base64.b64encode(array.array('d', columns['time'])).decode('ascii'),
+        'value': base64.b64encode(array.array(typecode, columns['value'])).decode('ascii')
+    }
+
 class SaleaeParserController:
     """Controller for Saleae Logic capture file parsing using both python-saleae API and Logic 2.x Automation API."""
     
+    # Number of Logic 2.x captures kept open for reuse
+    MAX_CACHED_CAPTURES = 4
+    # Number of checked file formats remembered by _check_file_format
+    MAX_CACHED_FORMATS = 128
+    
     def __init__(self, mcp: FastMCP):
         """
         Initialize the Saleae parser controller.
@@ -20,37 +140,132 @@ class SaleaeParserController:
             mcp (FastMCP): MCP server instance
         """
         self.mcp = mcp
-        self.saleae = None
-        self.manager = None
-        self.max_retries = 3
-        self.retry_delay = 1  # seconds
+        # Both APIs connect lazily on first use, see the saleae and manager properties
+        self._saleae: Optional[Saleae] = None
+        self._manager: Optional[Manager] = None
+        self._connect_lock = threading.Lock()
         
-        # Try to initialize both APIs
-        try:
-            # Initialize python-saleae API
-            self.saleae = Saleae()
-            logger.info("Successfully initialized python-saleae API")
-            
-            # Initialize Logic 2.x Automation API
-            self.manager = Manager.connect()
-            logger.info("Successfully initialized Logic 2.x Automation API")
-        except Exception as e:
-            logger.warning(f"Could not initialize Saleae APIs: {e}")
-            logger.warning("File parsing will be limited to offline mode")
+        # (absolute path, mtime_ns, size) of the .logicdata file currently loaded in Logic
+        self._loaded_key: Optional[Tuple[str, int, int]] = None
+        # Open Logic 2.x captures by the same key, least recently used first
+        self._sal_captures: "OrderedDict[Tuple[str, int, int], Capture]" = OrderedDict()
+        self._sal_captures_lock = threading.Lock()
+        # Absolute path -> (mtime_ns, format) for files already checked
+        self._format_cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        # python-saleae talks to Logic over a single socket, one command at a time
+        self._export_lock = threading.Lock()
         
+    @property
+    def saleae(self) -> Optional[Saleae]:
+        """python-saleae API, connected on first use; None if Logic is unreachable."""
+        if self._saleae is None:
+            with self._connect_lock:
+                if self._saleae is None:
+                    try:
+                        self._saleae = Saleae()
+                        logger.info("Successfully initialized python-saleae API")
+                    except Exception as e:
+                        logger.warning("Could not initialize python-saleae API: %s", e)
+        return self._saleae
+    
+    @saleae.setter
+    def saleae(self, value: Optional[Saleae]) -> None:
+        self._saleae = value
+    
+    @property
+    def manager(self) -> Optional[Manager]:
+        """Logic 2.x Automation API, connected on first use; None if Logic 2 is unreachable."""
+        if self._manager is None:
+            with self._connect_lock:
+                if self._manager is None:
+                    try:
+                        self._manager = Manager.connect()
+                        logger.info("Successfully initialized Logic 2.x Automation API")
+                    except Exception as e:
+                        logger.warning("Could not initialize Logic 2.x Automation API: %s", e)
+        return self._manager
+    
+    @manager.setter
+    def manager(self, value: Optional[Manager]) -> None:
+        self._manager = value
+    
     def _check_file_format(self, file_path: str) -> str:
         """Check if the file is a .sal or .logicdata file."""
         if not file_path:
             raise ValueError("No file path provided")
         
-        if not os.path.exists(file_path):
-            raise ValueError(f"File does not exist: {file_path}")
+        path = os.path.abspath(file_path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            raise ValueError(f"File does not exist: {file_path}") from None
+        
+        cached = self._format_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            self._format_cache.move_to_end(path)
+            return cached[1]
         
         file_ext = os.path.splitext(file_path)[1].lower()
         if file_ext not in ['.sal', '.logicdata']:
             raise ValueError(f"Unsupported file format: {file_ext}. Only .sal and .logicdata files are supported.")
         
-        return 'sal' if file_ext == '.sal' else 'logicdata'
+        file_format = 'sal' if file_ext == '.sal' else 'logicdata'
+        self._format_cache[path] = (mtime, file_format)
+        self._format_cache.move_to_end(path)
+        if len(self._format_cache) > self.MAX_CACHED_FORMATS:
+            self._format_cache.popitem(last=False)
+        return file_format
+    
+    @staticmethod
+    def _capture_key(capture_file: str) -> Tuple[str, int, int]:
+        """Identify a capture file by absolute path, mtime and size using a single stat."""
+        path = os.path.abspath(capture_file)
+        st = os.stat(path)
+        return path, st.st_mtime_ns, st.st_size
+    
+    def _ensure_loaded(self, capture_file: str) -> None:
+        """Load a .logicdata file with python-saleae unless it is already loaded and unchanged."""
+        key = self._capture_key(capture_file)
+        if key == self._loaded_key:
+            return
+        
+        self._loaded_key = None
+        self.saleae.load_from_file(capture_file)
+        self._wait_complete()
+        self._loaded_key = key
+    
+    def _wait_complete(self, timeout: float = 30.0) -> None:
+        """
+        Wait until Logic reports that processing is complete.
+        
+        Polls from 1 ms, doubling up to 50 ms, so fast operations return almost at once.
+        Raises TimeoutError if processing is still running after timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while not self.saleae.is_processing_complete():
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Logic processing did not complete within {timeout} seconds")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+    
+    def _get_sal_capture(self, capture_file: str) -> Capture:
+        """Return an open Logic 2.x capture for a .sal file, reusing a recently loaded one."""
+        key = self._capture_key(capture_file)
+        with self._sal_captures_lock:
+            capture = self._sal_captures.pop(key, None)
+            if capture is None:
+                capture = self.manager.load_capture(capture_file)
+            self._sal_captures[key] = capture
+            
+            # Close the least recently used captures beyond the cache size
+            while len(self._sal_captures) > self.MAX_CACHED_CAPTURES:
+                _, evicted = self._sal_captures.popitem(last=False)
+                try:
+                    evicted.close()
+                except Exception as e:
+                    logger.warning("Failed to close cached capture: %s", e)
+            return capture
     
     def _ensure_connection(self, file_format: str):
         """Ensure connection to Logic software, launching if necessary."""
@@ -60,37 +275,32 @@ class SaleaeParserController:
                 return
             return
         
-        # For logicdata format
-        if self.saleae is None:
-            try:
-                self.saleae = Saleae()
-                logger.info("Successfully initialized python-saleae API")
-            except Exception as e:
-                logger.error(f"Failed to initialize python-saleae API: {e}")
-                return
+        # For logicdata format; an existing python-saleae session is already connected
+        if self._saleae is not None:
+            return
         
-        retries = 0
-        while retries < self.max_retries:
+        if not _logic_socket_up():
             try:
-                self.saleae.connect()
-                logger.info("Successfully connected to Logic software")
-                return
+                # Start Logic without python-saleae's 1 s polling and probe the socket here instead
+                Saleae.launch_logic(timeout=0)
             except Exception as e:
-                if "Could not connect to Logic software" in str(e):
-                    try:
-                        self.saleae.launch_logic()
-                        time.sleep(self.retry_delay)
-                        logger.info("Successfully launched Logic software")
-                        return
-                    except Exception as launch_error:
-                        logger.error(f"Failed to launch Logic software: {launch_error}")
-                        return
-                logger.error(f"Connection error: {e}")
-                retries += 1
-                if retries < self.max_retries:
-                    time.sleep(self.retry_delay)
+                logger.error("Failed to launch Logic software: %s", e)
+                return
+            # A freshly launched Logic has nothing loaded
+            self._loaded_key = None
+            
+            deadline = time.monotonic() + _LOGIC_STARTUP_TIMEOUT
+            while not _logic_socket_up():
+                if time.monotonic() > deadline:
+                    logger.error("Logic software did not open its scripting socket in time")
+                    return
+                time.sleep(0.05)
+            logger.info("Successfully launched Logic software")
         
-        logger.error("Failed to connect to Logic software after maximum retries")
+        if self.saleae is None:
+            logger.error("Failed to connect to Logic software")
+            return
+        logger.info("Successfully connected to Logic software")
         
     def parse_capture_file(self, 
                           capture_file: Optional[str] = None,
@@ -128,19 +338,19 @@ class SaleaeParserController:
                     }
                 
                 # Use Logic 2.x API to get file info
-                with self.manager.load_capture(capture_file) as capture:
-                    return {
-                        "status": "success",
-                        "file_info": {
-                            "path": capture_file,
-                            "format": "Saleae Logic 2.x (.sal)",
-                            "duration": capture.duration,
-                            "digital_channels": list(range(capture.digital_channel_count)),
-                            "analog_channels": list(range(capture.analog_channel_count)),
-                            "digital_sample_rate": capture.digital_sample_rate,
-                            "analog_sample_rate": capture.analog_sample_rate
-                        }
+                capture = self._get_sal_capture(capture_file)
+                return {
+                    "status": "success",
+                    "file_info": {
+                        "path": capture_file,
+                        "format": "Saleae Logic 2.x (.sal)",
+                        "duration": capture.duration,
+                        "digital_channels": list(range(capture.digital_channel_count)),
+                        "analog_channels": list(range(capture.analog_channel_count)),
+                        "digital_sample_rate": capture.digital_sample_rate,
+                        "analog_sample_rate": capture.analog_sample_rate
                     }
+                }
             else:  # logicdata
                 if not self.saleae:
                     return {
@@ -150,11 +360,7 @@ class SaleaeParserController:
                     }
                 
                 # Use python-saleae API to get file info
-                self.saleae.load_from_file(capture_file)
-                
-                # Wait for processing to complete
-                while not self.saleae.is_processing_complete():
-                    time.sleep(0.1)
+                self._ensure_loaded(capture_file)
                 
                 return {
                     "status": "success",
@@ -175,7 +381,7 @@ class SaleaeParserController:
                 "details": "Only .sal and .logicdata files are supported"
                 }
         except Exception as e:
-            logger.error(f"Error parsing file: {e}")
+            logger.error("Error parsing file: %s", e)
             return {
                 "status": "error",
                 "message": "Failed to parse file",
@@ -187,7 +393,8 @@ class SaleaeParserController:
                         data: Optional[List[Dict[str, Union[float, bool]]]] = None,
                         channel: int = 0,
                         start_time: Optional[float] = None,
-                        end_time: Optional[float] = None) -> Dict[str, Any]:
+                        end_time: Optional[float] = None,
+                        return_format: Literal['soa', 'aos', 'packed'] = 'soa') -> Dict[str, Any]:
         """
         Get digital data for a specific channel.
         
@@ -197,98 +404,41 @@ class SaleaeParserController:
             channel: Channel number
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
+            return_format: 'soa' returns data as {'time': [...], 'value': [...]};
+                'aos' returns the legacy [{'time': t, 'value': v}, ...] list;
+                'packed' returns the columns as base64 encoded native arrays with their dtypes
         """
-        try:
-            if not capture_file:
-                return {
-                    "status": "error",
-                    "message": "No capture file provided",
-                    "details": "Saleae API requires a capture file for data extraction"
-                }
-            
-            # Check file format
-            file_format = self._check_file_format(capture_file)
-            
-            # Ensure connection based on file format
-            self._ensure_connection(file_format)
-            
-            if not self.saleae:
-                return {
-                    "status": "error",
-                    "message": "python-saleae API is not available",
-                    "details": "Please ensure Logic software is installed and running"
-                }
-            
-            # Use python-saleae API to get digital data
-            self.saleae.load_from_file(capture_file)
-            
-            # Wait for processing to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
-            
-            # Export digital data for the specified channel
-            temp_file = "temp_digital_export.csv"
-            self.saleae.export_data2(
-                temp_file,
-                digital_channels=[channel],
-                format='csv',
-                csv_column_headers=True,
-                csv_timestamp='time_stamp',
-                csv_combined=True,
-                csv_row_per_change=True
-            )
-            
-            # Wait for export to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
-            
-            # Read and parse the exported data
-            digital_data = []
-            with open(temp_file, 'r') as f:
-                # Skip header
-                next(f)
-                for line in f:
-                    timestamp, value = line.strip().split(',')
-                    digital_data.append({
-                        'time': float(timestamp),
-                        'value': int(value)
-                    })
-            
-            # Clean up temp file
-            os.remove(temp_file)
-            
-            # Filter by time range if specified
-            if start_time is not None or end_time is not None:
-                digital_data = [
-                    point for point in digital_data
-                    if (start_time is None or point['time'] >= start_time) and
-                       (end_time is None or point['time'] <= end_time)
-                ]
+        return self._get_channel_data(capture_file, [channel], start_time, end_time, return_format, kind='digital')
+        
+    def get_digital_data_multi(self,
+                               capture_file: Optional[str] = None,
+                               channels: Optional[List[int]] = None,
+                               start_time: Optional[float] = None,
+                               end_time: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get digital data for several channels of one capture.
+        
+        The capture is loaded once and all channels are exported together, so Logic
+        walks the capture a single time however many channels are requested.
+        
+        Args:
+            capture_file: Path to the capture file (optional)
+            channels: Channel numbers (defaults to channel 0)
+            start_time: Start time in seconds (optional)
+            end_time: End time in seconds (optional)
             
-            return {
-                "status": "success",
-                "data": digital_data
-            }
-        except ValueError as e:
-            return {
-                "status": "error",
-                "message": str(e),
-                "details": "Only .sal and .logicdata files are supported"
-            }
-        except Exception as e:
-            logger.error(f"Error getting digital data: {e}")
-            return {
-                "status": "error",
-                "message": "Failed to get digital data",
-                "details": str(e)
-            }
+        Returns:
+            Dict[str, Any]: data maps each channel to {'time': [...], 'value': [...]}
+        """
+        return self._get_channel_data(capture_file, channels or [0], start_time, end_time, kind='digital')
         
     def get_analog_data(self, 
                        capture_file: Optional[str] = None,
                        data: Optional[List[Dict[str, Union[float, float]]]] = None,
                        channel: int = 0,
                        start_time: Optional[float] = None,
-                       end_time: Optional[float] = None) -> Dict[str, Any]:
+                       end_time: Optional[float] = None,
+                       return_format: Literal['soa', 'aos', 'packed'] = 'soa') -> Dict[str, Any]:
         """
         Get analog data for a specific channel.
         
@@ -298,6 +448,25 @@ class SaleaeParserController:
             channel: Channel number
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
+            return_format: 'soa' returns data as {'time': [...], 'value': [...]};
+                'aos' returns the legacy [{'time': t, 'value': v}, ...] list;
+                'packed' returns the columns as base64 encoded native arrays with their dtypes
+        """
+        return self._get_channel_data(capture_file, [channel], start_time, end_time, return_format, kind='analog')
+        
+    def _get_channel_data(self,
+                          capture_file: Optional[str],
+                          channels: List[int],
+                          start_time: Optional[float],
+                          end_time: Optional[float],
+                          return_format: Optional[Literal['soa', 'aos', 'packed']] = None,
+                          *,
+                          kind: Literal['digital', 'analog']) -> Dict[str, Any]:
+        """
+        Shared implementation of get_digital_data, get_digital_data_multi and get_analog_data.
+        
+        With a return_format, data holds the single requested channel in that format;
+        without one, data maps each channel to its columns.
         """
         try:
             if not capture_file:
@@ -320,55 +489,21 @@ class SaleaeParserController:
                     "details": "Please ensure Logic software is installed and running"
                 }
             
-            # Use python-saleae API to get analog data
-            self.saleae.load_from_file(capture_file)
-            
-            # Wait for processing to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
-            
-            # Export analog data for the specified channel
-            temp_file = "temp_analog_export.csv"
-            self.saleae.export_data2(
-                temp_file,
-                analog_channels=[channel],
-                format='csv',
-                csv_column_headers=True,
-                csv_timestamp='time_stamp',
-                csv_combined=True,
-                csv_row_per_change=True
-            )
-            
-            # Wait for export to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
-            
-            # Read and parse the exported data
-            analog_data = []
-            with open(temp_file, 'r') as f:
-                # Skip header
-                next(f)
-                for line in f:
-                    timestamp, value = line.strip().split(',')
-                    analog_data.append({
-                        'time': float(timestamp),
-                        'value': float(value)
-                    })
-            
-            # Clean up temp file
-            os.remove(temp_file)
-            
-            # Filter by time range if specified
-            if start_time is not None or end_time is not None:
-                analog_data = [
-                    point for point in analog_data
-                    if (start_time is None or point['time'] >= start_time) and
-                       (end_time is None or point['time'] <= end_time)
-                ]
+            # Use python-saleae API to get the channel data
+            self._ensure_loaded(capture_file)
+            channel_data = self._export_channels(kind, channels, start_time, end_time)
             
+            if return_format is None:
+                data = channel_data
+            else:
+                data = channel_data[channels[0]]
+                if return_format == 'aos':
+                    data = _to_records(data)
+                elif return_format == 'packed':
+                    data = _to_packed(data, kind)
             return {
                 "status": "success",
-                "data": analog_data
+                "data": data
             }
         except ValueError as e:
             return {
@@ -377,13 +512,48 @@ class SaleaeParserController:
                 "details": "Only .sal and .logicdata files are supported"
             }
         except Exception as e:
-            logger.error(f"Error getting analog data: {e}")
+            logger.error("Error getting %s data: %s", kind, e)
             return {
                 "status": "error",
-                "message": "Failed to get analog data",
+                "message": f"Failed to get {kind} data",
                 "details": str(e)
             }
         
+    def _export_channels(self,
+                         kind: Literal['digital', 'analog'],
+                         channels: List[int],
+                         start_time: Optional[float],
+                         end_time: Optional[float]) -> Dict[int, Dict[str, List[Any]]]:
+        """
+        Export channels of the loaded capture in one pass and return the columns of each channel.
+        """
+        value_type, export_args, prefix = _CHANNEL_EXPORTS[kind]
+        # Export each channel once; the columns are matched back to channels by the CSV header
+        exported = sorted(set(channels))
+        temp_file = _temp_export_path(prefix)
+        try:
+            # python-saleae talks to Logic over one socket, so serialize the export
+            with self._export_lock:
+                self.saleae.export_data2(
+                    temp_file,
+                    time_span=_export_time_span(start_time, end_time),
+                    format='csv',
+                    **{f'{kind}_channels': exported},
+                    **export_args
+                )
+            # export_data2 returns once Logic has ACKed the finished export
+            
+            # Read and parse the exported data, filtered to the time range
+            times, values = _read_csv_window(temp_file, value_type, start_time, end_time, exported)
+        finally:
+            # Clean up temp file
+            _remove_quietly(temp_file)
+        
+        if len(exported) == 1 or kind == 'analog':
+            return {channel: {'time': times, 'value': values[channel]} for channel in exported}
+        # A combined digital export has a row whenever any channel changes
+        return {channel: _channel_changes(times, values[channel]) for channel in exported}
+        
     def export_data(self, 
                    capture_file: Optional[str] = None,
                    data: Optional[Dict[str, Any]] = None,
@@ -428,27 +598,27 @@ class SaleaeParserController:
                 }
             
             # Use python-saleae API to export data
-            self.saleae.load_from_file(capture_file)
+            self._ensure_loaded(capture_file)
             
-            # Wait for processing to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
+            # CSV settings depend on whether python-saleae picks its analog or digital exporter;
+            # other formats use the library defaults
+            export_args = {}
+            if format.lower() == 'csv':
+                exports_analog = bool(analog_channels) or (
+                    digital_channels is None and analog_channels is None and bool(self.saleae.get_active_channels()[1])
+                )
+                export_args = _ANALOG_CSV_ARGS if exports_analog else _DIGITAL_CSV_ARGS
             
             # Export data using export_data2
             self.saleae.export_data2(
                 output_file,
                 digital_channels=digital_channels,
                 analog_channels=analog_channels,
+                time_span=_export_time_span(start_time, end_time),
                 format=format,
-                csv_column_headers=True,
-                csv_timestamp='time_stamp',
-                csv_combined=True,
-                csv_row_per_change=True
+                **export_args
             )
-            
-            # Wait for export to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
+            # export_data2 returns once Logic has ACKed the finished export
             
             return {
                 "status": "success",
@@ -484,7 +654,7 @@ class SaleaeParserController:
                 "details": str(e)
             }
         except Exception as e:
-            logger.error(f"Error exporting data: {e}")
+            logger.error("Error exporting data: %s", e)
             return {
                 "status": "error",
                 "message": "Failed to export data",
@@ -522,11 +692,7 @@ class SaleaeParserController:
             self._ensure_connection('logicdata')
             
             # Load the capture file
-            self.saleae.load_from_file(capture_file)
-            
-            # Wait for processing to complete
-            while not self.saleae.is_processing_complete():
-                time.sleep(0.1)
+            self._ensure_loaded(capture_file)
             
             # Get sample rate based on channel type
             digital_channels, analog_channels = self.saleae.get_active_channels()
@@ -540,7 +706,7 @@ class SaleaeParserController:
                 "sample_rate": sample_rate
             }
         except Exception as e:
-            logger.error(f"Error getting sample rate: {e}")
+            logger.error("Error getting sample rate: %s", e)
             return {
                 "status": "error",
                 "message": "Failed to get sample rate",
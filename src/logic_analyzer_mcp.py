@@ -1,23 +1,37 @@
+import asyncio
 import logging
 import os
 import sys
 import argparse
 from typing import Optional
 
+# Optional faster event loop for the stdio transport (uvloop on POSIX, winloop on Windows)
+try:
+    if sys.platform == "win32":
+        import winloop as _fast_loop
+    else:
+        import uvloop as _fast_loop
+except ImportError:
+    _fast_loop = None
+
 # Add necessary paths for imports
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, script_dir)  # Add script directory to path
 
 from mcp.server.fastmcp import FastMCP
 from controllers.logic2_automation_controller import Logic2AutomationController
-from mcp import StdioServerParameters
 
-# Import controllers
-from controllers.saleae_parser_controller import SaleaeParserController
 from mcp_tools import setup_mcp_tools
 
-def main(enable_logic2: Optional[bool] = None):
-    """Start the MCP server. If enable_logic2 is None, CLI args/env determine it."""
+def _env_flag(name: str) -> bool:
+    """Return True if the environment variable is set to 1/true/yes."""
+    return str(os.environ.get(name, "")).lower() in ("1", "true", "yes")
+
+def main(enable_logic2: Optional[bool] = None, enable_saleae_parser: Optional[bool] = None):
+    """
+    Start the MCP server. If enable_logic2 or enable_saleae_parser is None,
+    CLI args/env determine it.
+    """
     # Setup logging
     logging.basicConfig(
         level=logging.WARNING,
@@ -25,13 +39,17 @@ def main(enable_logic2: Optional[bool] = None):
     )
     logger = logging.getLogger(__name__)
 
-    # Determine enable_logic2 from args if not explicitly provided
-    if enable_logic2 is None:
+    # Determine enable_logic2 / enable_saleae_parser from args if not explicitly provided
+    if enable_logic2 is None or enable_saleae_parser is None:
         parser = argparse.ArgumentParser(add_help=False)
         parser.add_argument('--logic2', action='store_true', help='Enable Logic2 experimental MCP tools')
+        parser.add_argument('--saleae-parser', action='store_true', help='Start the SaleaeParserController')
         # parse only known args, leave others untouched
         args, _ = parser.parse_known_args()
-        enable_logic2 = bool(args.logic2) or (os.environ.get("LOGIC2") and str(os.environ.get("LOGIC2")).lower() in ("1", "true", "yes"))
+        if enable_logic2 is None:
+            enable_logic2 = bool(args.logic2) or _env_flag("LOGIC2")
+        if enable_saleae_parser is None:
+            enable_saleae_parser = bool(args.saleae_parser) or _env_flag("SALEAE_PARSER")
 
     logger.info("Starting MCP server for Logic 2...")
 
@@ -45,17 +63,22 @@ def main(enable_logic2: Optional[bool] = None):
         # Setup MCP tools (pass enable_logic2)
         setup_mcp_tools(mcp, controller, enable_logic2=enable_logic2)
 
-        # Setup parser controller
-        logger.info("Initializing SaleaeParserController...")
-        parser_controller = SaleaeParserController(mcp)
-        logger.info("SaleaeParserController initialized successfully.")
+        # Setup parser controller only when requested
+        if enable_saleae_parser:
+            from controllers.saleae_parser_controller import SaleaeParserController
+            logger.info("Initializing SaleaeParserController...")
+            parser_controller = SaleaeParserController(mcp)
+            logger.info("SaleaeParserController initialized successfully.")
 
         # Run MCP server
+        if _fast_loop is not None:
+            asyncio.set_event_loop_policy(_fast_loop.EventLoopPolicy())
+            logger.info("Using %s event loop", _fast_loop.__name__)
         logger.info("Starting MCP server...")
         mcp.run()
 
     except Exception as e:
-        logger.error(f"Error running MCP server: {e}")
+        logger.error("Error running MCP server: %s", e)
         raise
 
 if __name__ == "__main__":
@@ -1,15 +1,21 @@
 from mcp import types
 from mcp.server.fastmcp import FastMCP, Context
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Literal
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from operator import attrgetter, itemgetter, le
 from saleae.automation import DeviceType
 from saleae import Saleae
-import os
-import json
+import csv
 import time
 import logging
+import math
 
 # Use shared saleae manager for instance creation/caching
 from logic_analyzer_mcp.saleae_manager import get_saleae
+from logic_analyzer_mcp.tool_utils import (
+    SharedSaleaeController, file_info, load_capture, safe_stat, tool_errors
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +25,46 @@ try:
 except Exception:
     DeviceType = None
 
-def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
+# Case-insensitive device type lookup, built once instead of per tool call
+_DEVICE_TYPES = {name.upper(): member for name, member in DeviceType.__members__.items()} if DeviceType is not None else {}
+
+# Write buffer for CSV exports of caller-supplied data
+_CSV_WRITE_BUFFER_SIZE = 1 << 20
+
+def _write_csv(output_file: str, header: List[str], rows) -> None:
+    """Write a header and rows to output_file with csv.writer in one buffered pass."""
+    with open(output_file, 'w', newline='', buffering=_CSV_WRITE_BUFFER_SIZE) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def _filter_time_range(data: List[Dict[str, Any]],
+                       start_time: Optional[float],
+                       end_time: Optional[float]) -> List[Dict[str, Any]]:
+    """Return the records of data whose 'time' lies within [start_time, end_time]."""
+    if start_time is None and end_time is None:
+        return data
+    times = list(map(itemgetter('time'), data))
+    if not all(map(le, times, islice(times, 1, None))):
+        # Caller-supplied data is not time-ordered; fall back to one full scan with open bounds as infinities
+        lo = -math.inf if start_time is None else start_time
+        hi = math.inf if end_time is None else end_time
+        return [d for d, t in zip(data, times, strict=True) if lo <= t <= hi]
+    lo = 0 if start_time is None else bisect_left(times, start_time)
+    hi = len(times) if end_time is None else bisect_right(times, end_time)
+    return data[lo:hi]
+
+def setup_mcp_tools_experimental(mcp: FastMCP, controller=None, shared_saleae=None) -> None:
+    if shared_saleae is None:
+        # controllers/ is only on sys.path once logic_analyzer_mcp has set it up, so import per setup
+        from controllers.saleae_controller import SaleaeController
+        shared_saleae = SharedSaleaeController(SaleaeController)
 
     controller_instance = controller
 
     # if controller is not None:
     @mcp.tool("create_device_config")
+    @tool_errors("Failed to create device configuration")
     def create_device_config(ctx: Context, 
                             name: str,
                             digital_channels: List[int],
@@ -33,102 +73,88 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
                             analog_sample_rate: Optional[int] = None,
                             digital_threshold_volts: Optional[float] = None) -> Dict[str, Any]:
         """Create a new device configuration for Saleae Logic 2."""
-        try:
-            config_name = controller.create_device_config(
-                name=name,
-                digital_channels=digital_channels,
-                digital_sample_rate=digital_sample_rate,
-                analog_channels=analog_channels,
-                analog_sample_rate=analog_sample_rate,
-                digital_threshold_volts=digital_threshold_volts
-            )
-            return {"status": "success", "message": f"Created device configuration: {config_name}"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to create device configuration: {str(e)}"}
+        config_name = controller.create_device_config(
+            name=name,
+            digital_channels=digital_channels,
+            digital_sample_rate=digital_sample_rate,
+            analog_channels=analog_channels,
+            analog_sample_rate=analog_sample_rate,
+            digital_threshold_volts=digital_threshold_volts
+        )
+        return {"status": "success", "message": f"Created device configuration: {config_name}"}
 
     @mcp.tool("create_capture_config")
+    @tool_errors("Failed to create capture configuration")
     def create_capture_config(ctx: Context,
                             name: str,
                             duration_seconds: float,
                             buffer_size_megabytes: Optional[int] = None) -> Dict[str, Any]:
         """Create a new capture configuration for Saleae Logic 2."""
-        try:
-            config_name = controller.create_capture_config(
-                name=name,
-                duration_seconds=duration_seconds,
-                buffer_size_megabytes=buffer_size_megabytes
-            )
-            return {"status": "success", "message": f"Created capture configuration: {config_name}"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to create capture configuration: {str(e)}"}
+        config_name = controller.create_capture_config(
+            name=name,
+            duration_seconds=duration_seconds,
+            buffer_size_megabytes=buffer_size_megabytes
+        )
+        return {"status": "success", "message": f"Created capture configuration: {config_name}"}
 
     @mcp.tool("get_available_devices")
+    @tool_errors("Failed to get available devices")
     def get_available_devices(ctx: Context) -> Dict[str, Any]:
         """Get list of available Saleae Logic devices."""
-        try:
-            devices = controller.get_available_devices()
-            return {"status": "success", "devices": devices}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to get available devices: {str(e)}"}
+        devices = controller.get_available_devices()
+        return {"status": "success", "devices": devices}
 
     @mcp.tool("find_device_by_type")
+    @tool_errors("Failed to find device")
     def find_device_by_type(ctx: Context, device_type: str) -> Dict[str, Any]:
         """Find a Saleae Logic device by its type."""
-        try:
-            device = controller.find_device_by_type(DeviceType[device_type])
-            if device:
-                return {"status": "success", "device": device}
-            return {"status": "error", "message": f"No device found of type {device_type}"}
-        except ValueError as e:
-            return {"status": "error", "message": str(e)}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to find device: {str(e)}"}
+        device_enum = _DEVICE_TYPES.get(device_type.upper())
+        if device_enum is None:
+            return {"status": "error", "message": f"Unknown device type: {device_type}"}
+        device = controller.find_device_by_type(device_enum)
+        if device:
+            return {"status": "success", "device": device}
+        return {"status": "error", "message": f"No device found of type {device_type}"}
 
     @mcp.tool("list_device_configs")
+    @tool_errors("Failed to list device configurations")
     def list_device_configs(ctx: Context) -> Dict[str, Any]:
         """List all available device configurations."""
-        try:
-            configs = controller.list_device_configs()
-            return {"status": "success", "configurations": configs}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to list device configurations: {str(e)}"}
+        configs = controller.list_device_configs()
+        return {"status": "success", "configurations": configs}
 
     @mcp.tool("list_capture_configs")
+    @tool_errors("Failed to list capture configurations")
     def list_capture_configs(ctx: Context) -> Dict[str, Any]:
         """List all available capture configurations."""
-        try:
-            configs = controller.list_capture_configs()
-            return {"status": "success", "configurations": configs}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to list capture configurations: {str(e)}"}
+        configs = controller.list_capture_configs()
+        return {"status": "success", "configurations": configs}
 
     @mcp.tool("remove_device_config")
+    @tool_errors("Failed to remove device configuration")
     def remove_device_config(ctx: Context, name: str) -> Dict[str, Any]:
         """Remove a device configuration."""
-        try:
-            if controller.remove_device_config(name):
-                return {"status": "success", "message": f"Removed device configuration: {name}"}
-            return {"status": "error", "message": f"Device configuration {name} not found"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to remove device configuration: {str(e)}"}
+        if controller.remove_device_config(name):
+            return {"status": "success", "message": f"Removed device configuration: {name}"}
+        return {"status": "error", "message": f"Device configuration {name} not found"}
 
     @mcp.tool("remove_capture_config")
+    @tool_errors("Failed to remove capture configuration")
     def remove_capture_config(ctx: Context, name: str) -> Dict[str, Any]:
         """Remove a capture configuration."""
-        try:
-            if controller.remove_capture_config(name):
-                return {"status": "success", "message": f"Removed capture configuration: {name}"}
-            return {"status": "error", "message": f"Capture configuration {name} not found"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to remove capture configuration: {str(e)}"}
+        if controller.remove_capture_config(name):
+            return {"status": "success", "message": f"Removed capture configuration: {name}"}
+        return {"status": "error", "message": f"Capture configuration {name} not found"}
 
     @mcp.tool("get_digital_data")
+    @tool_errors("Failed to get digital data")
     def get_digital_data(ctx: Context, 
                         capture_file: Optional[str] = None,
                         data: Optional[List[Dict[str, Union[float, bool]]]] = None,
                         channel: int = 0,
                         start_time: Optional[float] = None,
-                        end_time: Optional[float] = None) -> Dict[str, Any]:
+                        end_time: Optional[float] = None,
+                        return_format: Literal['soa', 'aos'] = 'soa') -> Dict[str, Any]:
         """
         Get digital data for a specific channel.
         
@@ -138,68 +164,61 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             channel: Channel number
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
+            return_format: For capture files, 'soa' returns data as {'time': [...], 'value': [...]};
+                'aos' returns the legacy [{'time': t, 'value': v}, ...] list
         """
-        try:
-            if data is not None:
-                # Filter data by time range if specified
-                if start_time is not None:
-                    data = [d for d in data if d['time'] >= start_time]
-                if end_time is not None:
-                    data = [d for d in data if d['time'] <= end_time]
+        if data is not None:
+            # Filter data by time range if specified
+            data = _filter_time_range(data, start_time, end_time)
+            return {
+                "status": "success",
+                "data": data
+            }
+        elif capture_file is not None:
+            st = safe_stat(capture_file)
+            if st is None:
+                return {"status": "error", "message": f"Capture file not found: {capture_file}"}
+            
+            # Get Saleae instance
+            saleae_instance = get_saleae()
+            if saleae_instance is None:
                 return {
                     "status": "success",
-                    "data": data
+                    "file_info": file_info(capture_file, st)
                 }
-            elif capture_file is not None:
-                if not os.path.exists(capture_file):
-                    return {"status": "error", "message": f"Capture file not found: {capture_file}"}
+            
+            try:
+                # Load the capture file using Saleae API
+                capture = load_capture(saleae_instance, capture_file, st)
                 
-                # Get Saleae instance
-                saleae_instance = get_saleae()
-                if saleae_instance is None:
-                    return {
-                        "status": "success",
-                        "file_info": {
-                            "path": capture_file,
-                            "format": "Saleae Logic (.sal)",
-                            "size": os.path.getsize(capture_file),
-                            "modified": os.path.getmtime(capture_file)
-                        }
-                    }
+                # Get digital data for the specified channel
+                digital_data = list(capture.get_digital_data(channel, start_time, end_time))
                 
-                try:
-                    # Load the capture file using Saleae API
-                    capture = saleae_instance.load_capture(capture_file)
-                    
-                    # Get digital data for the specified channel
-                    digital_data = capture.get_digital_data(channel, start_time, end_time)
-                    
-                    # Convert to list of dictionaries
-                    data = [
-                        {
-                            "time": point.time,
-                            "value": point.value
-                        }
-                        for point in digital_data
-                    ]
-                    
-                    return {
-                        "status": "success",
-                        "channel": channel,
-                        "data": data,
-                        "total_samples": len(data)
-                    }
-                except Exception as e:
-                    return {
-                        "status": "error",
-                        "message": f"Failed to get digital data: {str(e)}"
+                if return_format == 'aos':
+                    data = [{"time": point.time, "value": point.value} for point in digital_data]
+                else:
+                    # One list per field instead of a dict per sample
+                    data = {
+                        "time": list(map(attrgetter('time'), digital_data)),
+                        "value": list(map(attrgetter('value'), digital_data))
                     }
-            else:
-                return {"status": "error", "message": "Either capture_file or data must be provided"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to get digital data: {str(e)}"}
+                
+                return {
+                    "status": "success",
+                    "channel": channel,
+                    "data": data,
+                    "total_samples": len(digital_data)
+                }
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"Failed to get digital data: {str(e)}"
+                }
+        else:
+            return {"status": "error", "message": "Either capture_file or data must be provided"}
 
     @mcp.tool("get_analog_data")
+    @tool_errors("Failed to get analog data")
     def get_analog_data(ctx: Context,
                     capture_file: Optional[str] = None,
                     data: Optional[List[Dict[str, Union[float, float]]]] = None,
@@ -216,34 +235,29 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
         """
-        try:
-            if data is not None:
-                # Filter data by time range if specified
-                if start_time is not None:
-                    data = [d for d in data if d['time'] >= start_time]
-                if end_time is not None:
-                    data = [d for d in data if d['time'] <= end_time]
-                return {
-                    "status": "success",
-                    "data": data
-                }
-            elif capture_file is not None:
-                if not os.path.exists(capture_file):
-                    raise FileNotFoundError(f"Capture file not found: {capture_file}")
-                saleae_instance = get_saleae()
-                if saleae_instance is None:
-                    return {"status": "error", "message": "Saleae instance not available"}
-                data = saleae_instance.get_analog_data(capture_file, channel, start_time, end_time)
-                return {
-                    "status": "success",
-                    "data": data
-                }
-            else:
-                return {"status": "error", "message": "Either capture_file or data must be provided"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to get analog data: {str(e)}"}
+        if data is not None:
+            # Filter data by time range if specified
+            data = _filter_time_range(data, start_time, end_time)
+            return {
+                "status": "success",
+                "data": data
+            }
+        elif capture_file is not None:
+            if safe_stat(capture_file) is None:
+                raise FileNotFoundError(f"Capture file not found: {capture_file}")
+            saleae_instance = get_saleae()
+            if saleae_instance is None:
+                return {"status": "error", "message": "Saleae instance not available"}
+            data = saleae_instance.get_analog_data(capture_file, channel, start_time, end_time)
+            return {
+                "status": "success",
+                "data": data
+            }
+        else:
+            return {"status": "error", "message": "Either capture_file or data must be provided"}
             
     @mcp.tool("export_digital_data")
+    @tool_errors("Failed to export digital data")
     def export_digital_data(ctx: Context,
                         output_file: str,
                         capture_file: Optional[str] = None,
@@ -262,39 +276,31 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
         """
-        try:
-            if data is not None:
-                # Filter data by time range if specified
-                if start_time is not None:
-                    data = [d for d in data if d['time'] >= start_time]
-                if end_time is not None:
-                    data = [d for d in data if d['time'] <= end_time]
-                # Export to CSV
-                with open(output_file, 'w') as f:
-                    f.write("Time,Value\n")
-                    for entry in data:
-                        f.write(f"{entry['time']},{entry['value']}\n")
-                return {
-                    "status": "success",
-                    "message": f"Exported digital data to {output_file}"
-                }
-            elif capture_file is not None:
-                if not os.path.exists(capture_file):
-                    raise FileNotFoundError(f"Capture file not found: {capture_file}")
-                saleae_instance = get_saleae()
-                if saleae_instance is None:
-                    return {"status": "error", "message": "Saleae instance not available"}
-                saleae_instance.export_digital_data(capture_file, output_file, channels, start_time, end_time)
-                return {
-                    "status": "success",
-                    "message": f"Exported digital data to {output_file}"
-                }
-            else:
-                return {"status": "error", "message": "Either capture_file or data must be provided"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to export digital data: {str(e)}"}
+        if data is not None:
+            # Filter data by time range if specified
+            data = _filter_time_range(data, start_time, end_time)
+            # Export to CSV
+            _write_csv(output_file, ["Time", "Value"], map(itemgetter('time', 'value'), data))
+            return {
+                "status": "success",
+                "message": f"Exported digital data to {output_file}"
+            }
+        elif capture_file is not None:
+            if safe_stat(capture_file) is None:
+                raise FileNotFoundError(f"Capture file not found: {capture_file}")
+            saleae_instance = get_saleae()
+            if saleae_instance is None:
+                return {"status": "error", "message": "Saleae instance not available"}
+            saleae_instance.export_digital_data(capture_file, output_file, channels, start_time, end_time)
+            return {
+                "status": "success",
+                "message": f"Exported digital data to {output_file}"
+            }
+        else:
+            return {"status": "error", "message": "Either capture_file or data must be provided"}
             
     @mcp.tool("export_analog_data")
+    @tool_errors("Failed to export analog data")
     def export_analog_data(ctx: Context,
                         output_file: str,
                         capture_file: Optional[str] = None,
@@ -313,89 +319,91 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
         """
-        try:
-            if data is not None:
-                # Filter data by time range if specified
-                if start_time is not None:
-                    data = [d for d in data if d['time'] >= start_time]
-                if end_time is not None:
-                    data = [d for d in data if d['time'] <= end_time]
-                # Export to CSV
-                with open(output_file, 'w') as f:
-                    f.write("Time,Voltage\n")
-                    for entry in data:
-                        f.write(f"{entry['time']},{entry['voltage']}\n")
-                return {
-                    "status": "success",
-                    "message": f"Exported analog data to {output_file}"
-                }
-            elif capture_file is not None:
-                if not os.path.exists(capture_file):
-                    raise FileNotFoundError(f"Capture file not found: {capture_file}")
-                saleae_instance = get_saleae()
-                if saleae_instance is None:
-                    return {"status": "error", "message": "Saleae instance not available"}
-                saleae_instance.export_analog_data(capture_file, output_file, channels, start_time, end_time)
-                return {
-                    "status": "success",
-                    "message": f"Exported analog data to {output_file}"
-                }
-            else:
-                return {"status": "error", "message": "Either capture_file or data must be provided"}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to export analog data: {str(e)}"}
+        if data is not None:
+            # Filter data by time range if specified
+            data = _filter_time_range(data, start_time, end_time)
+            # Export to CSV
+            _write_csv(output_file, ["Time", "Voltage"], map(itemgetter('time', 'voltage'), data))
+            return {
+                "status": "success",
+                "message": f"Exported analog data to {output_file}"
+            }
+        elif capture_file is not None:
+            if safe_stat(capture_file) is None:
+                raise FileNotFoundError(f"Capture file not found: {capture_file}")
+            saleae_instance = get_saleae()
+            if saleae_instance is None:
+                return {"status": "error", "message": "Saleae instance not available"}
+            saleae_instance.export_analog_data(capture_file, output_file, channels, start_time, end_time)
+            return {
+                "status": "success",
+                "message": f"Exported analog data to {output_file}"
+            }
+        else:
+            return {"status": "error", "message": "Either capture_file or data must be provided"}
 
 
     # Protocol and Data Analysis tools
     @mcp.tool("detect_protocols")
-    def detect_protocols(ctx: Context, capture_file: str) -> Dict[str, Any]:
+    @tool_errors("Failed to detect protocols")
+    def detect_protocols(ctx: Context,
+                        capture_file: str,
+                        return_format: Literal['soa', 'aos'] = 'soa') -> Dict[str, Any]:
         """
         Detect protocols in a capture file.
         
         Args:
             capture_file: Path to the capture file
+            return_format: 'soa' returns protocols as {'name': [...], 'type': [...], 'channels': [...],
+                'settings': [...]}; 'aos' returns the legacy list of one dict per analyzer
         """
-        try:
-            if not os.path.exists(capture_file):
-                return {"status": "error", "message": f"Capture file not found: {capture_file}"}
-            
-            saleae_instance = get_saleae()
-            if saleae_instance is None:
-                return {
-                    "status": "success",
-                    "file_info": {
-                        "path": capture_file,
-                        "format": "Saleae Logic (.sal)",
-                        "size": os.path.getsize(capture_file),
-                        "modified": os.path.getmtime(capture_file)
-                    }
-                }
-            
-            # Load capture and get protocol analyzers
-            capture = saleae_instance.load_capture(capture_file)
-            analyzers = capture.get_analyzers()
-            
+        st = safe_stat(capture_file)
+        if st is None:
+            return {"status": "error", "message": f"Capture file not found: {capture_file}"}
+        
+        saleae_instance = get_saleae()
+        if saleae_instance is None:
             return {
                 "status": "success",
-                "protocols": [
-                    {
-                        "name": analyzer.name,
-                        "type": analyzer.type,
-                        "channels": analyzer.channels,
-                        "settings": analyzer.settings
-                    }
-                    for analyzer in analyzers
-                ]
+                "file_info": file_info(capture_file, st)
             }
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to detect protocols: {str(e)}"}
+        
+        # Load capture and get protocol analyzers
+        capture = load_capture(saleae_instance, capture_file, st)
+        analyzers = list(capture.get_analyzers())
+        
+        if return_format == 'aos':
+            protocols = [
+                {
+                    "name": analyzer.name,
+                    "type": analyzer.type,
+                    "channels": analyzer.channels,
+                    "settings": analyzer.settings
+                }
+                for analyzer in analyzers
+            ]
+        else:
+            # One list per field instead of a dict per analyzer
+            protocols = {
+                field: list(map(attrgetter(field), analyzers))
+                for field in ("name", "type", "channels", "settings")
+            }
+        
+        return {
+            "status": "success",
+            "protocols": protocols
+        }
 
     @mcp.tool("get_protocol_data")
+    @tool_errors("Failed to get protocol data")
     def get_protocol_data(ctx: Context, 
                         capture_file: str,
                         protocol_type: str,
                         start_time: Optional[float] = None,
-                        end_time: Optional[float] = None) -> Dict[str, Any]:
+                        end_time: Optional[float] = None,
+                        max_packets: Optional[int] = None,
+                        offset: int = 0,
+                        return_format: Literal['soa', 'aos'] = 'soa') -> Dict[str, Any]:
         """
         Get protocol data from a capture file.
         
@@ -404,50 +412,64 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             protocol_type: Type of protocol to analyze (e.g., 'I2C', 'SPI', 'UART')
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
+            max_packets: Maximum number of packets to return (optional, default all)
+            offset: Number of packets to skip, for paging through long captures
+            return_format: 'soa' returns data as {'time': [...], 'type': [...], 'data': [...], 'metadata': [...]};
+                'aos' returns the legacy list of one dict per packet
         """
-        try:
-            if not os.path.exists(capture_file):
-                return {"status": "error", "message": f"Capture file not found: {capture_file}"}
-            
-            saleae_instance = get_saleae()
-            if saleae_instance is None:
-                return {
-                    "status": "success",
-                    "file_info": {
-                        "path": capture_file,
-                        "format": "Saleae Logic (.sal)",
-                        "size": os.path.getsize(capture_file),
-                        "modified": os.path.getmtime(capture_file)
-                    }
-                }
-            
-            # Load capture and get protocol analyzer
-            capture = saleae_instance.load_capture(capture_file)
-            analyzer = capture.get_analyzer(protocol_type)
-            
-            if analyzer is None:
-                return {"status": "error", "message": f"No {protocol_type} analyzer found"}
-            
-            # Get protocol data
-            data = analyzer.get_data(start_time, end_time)
-            
+        st = safe_stat(capture_file)
+        if st is None:
+            return {"status": "error", "message": f"Capture file not found: {capture_file}"}
+        
+        saleae_instance = get_saleae()
+        if saleae_instance is None:
             return {
                 "status": "success",
-                "protocol": protocol_type,
-                "data": [
-                    {
-                        "time": packet.time,
-                        "type": packet.type,
-                        "data": packet.data,
-                        "metadata": packet.metadata
-                    }
-                    for packet in data
-                ]
+                "file_info": file_info(capture_file, st)
             }
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to get protocol data: {str(e)}"}
+        
+        # Load capture and get protocol analyzer
+        capture = load_capture(saleae_instance, capture_file, st)
+        analyzer = capture.get_analyzer(protocol_type)
+        
+        if analyzer is None:
+            return {"status": "error", "message": f"No {protocol_type} analyzer found"}
+        
+        # Get protocol data, materializing only the requested page (plus one packet to detect more)
+        data = analyzer.get_data(start_time, end_time)
+        stop = None if max_packets is None else offset + max_packets + 1
+        packets = list(islice(data, offset, stop))
+        has_more = max_packets is not None and len(packets) > max_packets
+        if has_more:
+            del packets[max_packets:]
+        
+        if return_format == 'aos':
+            data = [
+                {
+                    "time": packet.time,
+                    "type": packet.type,
+                    "data": packet.data,
+                    "metadata": packet.metadata
+                }
+                for packet in packets
+            ]
+        else:
+            # One list per field instead of a dict per packet
+            data = {
+                field: list(map(attrgetter(field), packets))
+                for field in ("time", "type", "data", "metadata")
+            }
+        
+        return {
+            "status": "success",
+            "protocol": protocol_type,
+            "offset": offset,
+            "has_more": has_more,
+            "data": data
+        }
 
     @mcp.tool("get_digital_data_batch_mcp")
+    @tool_errors("Error getting digital data", on_error=shared_saleae.drop)
     def get_digital_data_batch_mcp(ctx: Context,
                                 capture_file: str,
                                 channels: List[int],
@@ -455,18 +477,14 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
                                 end_time: Optional[float] = None,
                                 max_samples: Optional[int] = None) -> Dict[str, Any]:
         """Get digital data from multiple channels in a capture file."""
-        try:
-            from controllers.saleae_controller import SaleaeController
-            controller = SaleaeController()
-            return controller.get_digital_data_batch(
-                capture_file=capture_file,
-                channels=channels,
-                start_time=start_time,
-                end_time=end_time,
-                max_samples=max_samples
-            )
-        except Exception as e:
-            return {"status": "error", "message": f"Error getting digital data: {str(e)}"}
+        controller = shared_saleae.get()
+        return controller.get_digital_data_batch(
+            capture_file=capture_file,
+            channels=channels,
+            start_time=start_time,
+            end_time=end_time,
+            max_samples=max_samples
+        )
 
 
     # TODO: Temporarily disabled analyze functions - will be re-enabled after Saleae API integration is complete
@@ -485,23 +503,19 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
         try:
-            if not os.path.exists(capture_file):
+            st = safe_stat(capture_file)
+            if st is None:
                 return {"status": "error", "message": f"Capture file not found: {capture_file}"}
             
             saleae_instance = get_saleae()
             if saleae_instance is None:
                 return {
                     "status": "success",
-                    "file_info": {
-                        "path": capture_file,
-                        "format": "Saleae Logic (.sal)",
-                        "size": os.path.getsize(capture_file),
-                        "modified": os.path.getmtime(capture_file)
-                    }
+                    "file_info": file_info(capture_file, st)
                 }
             
             # Load capture and get digital data
-            capture = saleae_instance.load_capture(capture_file)
+            capture = load_capture(saleae_instance, capture_file, st)
             data = capture.get_digital_data(channel, start_time, end_time)
             
             # Analyze transitions
@@ -539,30 +553,26 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
         try:
-            if not os.path.exists(capture_file):
+            st = safe_stat(capture_file)
+            if st is None:
                 return {"status": "error", "message": f"Capture file not found: {capture_file}"}
             
             saleae_instance = get_saleae()
             if saleae_instance is None:
                 return {
                     "status": "success",
-                    "file_info": {
-                        "path": capture_file,
-                        "format": "Saleae Logic (.sal)",
-                        "size": os.path.getsize(capture_file),
-                        "modified": os.path.getmtime(capture_file)
-                    }
+                    "file_info": file_info(capture_file, st)
                 }
             
             # Load capture and get analog data
-            capture = saleae_instance.load_capture(capture_file)
+            capture = load_capture(saleae_instance, capture_file, st)
             data = capture.get_analog_data(channel, start_time, end_time)
             
             if not data:
                 return {"status": "error", "message": "No analog data found"}
             
-            # Calculate statistics
-            values = [point.voltage for point in data]
+            # Calculate statistics; min/max/sum each run as a single C-level pass over the list
+            values = list(map(attrgetter('voltage'), data))
             min_voltage = min(values)
             max_voltage = max(values)
             avg_voltage = sum(values) / len(values)
@@ -596,23 +606,19 @@ def setup_mcp_tools_experimental(mcp: FastMCP, controller=None) -> None:
             start_time: Start time in seconds (optional)
             end_time: End time in seconds (optional)
         try:
-            if not os.path.exists(capture_file):
+            st = safe_stat(capture_file)
+            if st is None:
                 return {"status": "error", "message": f"Capture file not found: {capture_file}"}
             
             saleae_instance = get_saleae()
             if saleae_instance is None:
                 return {
                     "status": "success",
-                    "file_info": {
-                        "path": capture_file,
-                        "format": "Saleae Logic (.sal)",
-                        "size": os.path.getsize(capture_file),
-                        "modified": os.path.getmtime(capture_file)
-                    }
+                    "file_info": file_info(capture_file, st)
                 }
             
             # Load capture and get protocol analyzer
-            capture = saleae_instance.load_capture(capture_file)
+            capture = load_capture(saleae_instance, capture_file, st)
             analyzer = capture.get_analyzer(protocol_type)
             
             if analyzer is None:
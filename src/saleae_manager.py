@@ -1,6 +1,10 @@
 import os
+import random
+import subprocess
+import threading
 import time
 import logging
+from dataclasses import dataclass
 from typing import Optional
 try:
     from saleae import Saleae
@@ -11,10 +15,19 @@ logger = logging.getLogger(__name__)
 
 _saleae_instance: Optional[Saleae] = None
 
-def create_saleae_instance(max_retries=3, retry_delay=2) -> Optional[Saleae]:
-	"""
-	Create a Saleae instance with automatic launch and retry mechanism.
-	"""
+@dataclass(frozen=True)
+class _SaleaePath:
+	"""Location of the Logic executable and its permissions when it was found."""
+	path: str
+	readable: bool
+	executable: bool
+
+# Resolved Logic executable, shared by every create_saleae_instance call in the process
+_SALEAE_PATH_CACHE: Optional[_SaleaePath] = None
+_SALEAE_PATH_LOCK = threading.Lock()
+
+def _scan_saleae_paths() -> Optional[_SaleaePath]:
+	"""Probe the common install locations for Logic.exe."""
 	# Define all possible paths where Logic.exe might be installed
 	common_paths = [
 		os.path.expandvars(r"%ProgramFiles%\Saleae\Logic\Logic.exe"),
@@ -23,69 +36,121 @@ def create_saleae_instance(max_retries=3, retry_delay=2) -> Optional[Saleae]:
 		os.path.expanduser(r"~\AppData\Local\Programs\Saleae\Logic\Logic.exe")
 	]
 
-	# First, check if any of the paths exist
-	saleae_path = None
+	# Keep the first hit in priority order
 	for path in common_paths:
-		logger.info(f"Checking path: {path}")
 		if os.path.exists(path):
-			saleae_path = path
 			logger.info(f"Found Saleae Logic at: {path}")
 			# Check file permissions
+			readable = executable = False
 			try:
-				if os.access(path, os.R_OK):
-					logger.info(f"File is readable: {path}")
-				else:
+				readable = os.access(path, os.R_OK)
+				if not readable:
 					logger.warning(f"File exists but is not readable: {path}")
-				if os.access(path, os.X_OK):
-					logger.info(f"File is executable: {path}")
-				else:
+				executable = os.access(path, os.X_OK)
+				if not executable:
 					logger.warning(f"File exists but is not executable: {path}")
 			except Exception as e:
 				logger.warning(f"Error checking file permissions: {str(e)}")
-			break
-		else:
-			logger.info(f"Path does not exist: {path}")
+			return _SaleaePath(path, readable, executable)
+	logger.debug("Saleae Logic not found in: %s", common_paths)
+	return None
+
+def _resolve_saleae_path() -> Optional[_SaleaePath]:
+	"""Return the cached Logic executable location, scanning the filesystem on first use."""
+	global _SALEAE_PATH_CACHE
+	if _SALEAE_PATH_CACHE is None:
+		with _SALEAE_PATH_LOCK:
+			if _SALEAE_PATH_CACHE is None:
+				_SALEAE_PATH_CACHE = _scan_saleae_paths()
+	return _SALEAE_PATH_CACHE
+
+# Longest wait for a Logic process we launched to accept connections before it is killed
+_LAUNCH_TIMEOUT = 30.0
 
-	if saleae_path is None:
+def _backoff_delay(attempt: int, retry_delay: float) -> float:
+	"""Exponential back-off from retry_delay, capped at 10 s, plus up to 200 ms of jitter."""
+	return min(retry_delay * (2 ** attempt), 10) + random.uniform(0, 0.2)
+
+def create_saleae_instance(max_retries=7, retry_delay=0.2) -> Optional[Saleae]:
+	"""
+	Create a Saleae instance with automatic launch and retry mechanism.
+
+	Retries back off exponentially from retry_delay, so a running Logic is picked up
+	within a fraction of a second while a cold start still gets time to come up. With the
+	defaults the six waits between the seven attempts total 12.6-13.8 s (0.2 s doubling to
+	6.4 s, plus jitter); the earlier defaults, max_retries=3 and a fixed 2 s delay, waited 4 s.
+	Callers passing only max_retries get far shorter waits than they used to.
+	"""
+	# Find Logic.exe once per process; a missing install is rescanned on the next call
+	resolved = _resolve_saleae_path()
+	if resolved is None:
 		logger.error("Saleae Logic software not found in common locations.")
 		return None
+	saleae_path = resolved.path
 
 	if Saleae is None:
 		logger.error("python-saleae package not available (Saleae import failed).")
 		return None
 
+	launched = False
+	# Logic process started by us, and when to give up on it
+	proc = None
+	deadline = None
+	# Connected client, kept across attempts until its socket fails
+	saleae = None
 	for attempt in range(max_retries):
 		try:
 			# Try to create a new instance
-			saleae = Saleae()
+			if saleae is None:
+				saleae = Saleae()
 			# Test the connection
 			saleae.get_connected_devices()
 			return saleae
 		except Exception as e:
 			logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {str(e)}")
+			if isinstance(e, OSError):
+				saleae = None
+
+			if proc is not None:
+				if proc.poll() is not None:
+					logger.error(f"Saleae Logic exited during startup with code {proc.returncode}")
+					return None
+				if time.monotonic() >= deadline:
+					logger.error(f"Saleae Logic did not accept connections within {_LAUNCH_TIMEOUT:.0f} s; stopping it")
+					proc.kill()
+					return None
 
 			if attempt < max_retries - 1:
-				try:
-					# Try to launch the software using the found path
-					logger.info(f"Attempting to launch Saleae Logic from: {saleae_path}")
-					# Try to launch using subprocess first
+				# Launch Logic once, then keep retrying the connection while it starts
+				if not launched:
 					try:
-						import subprocess
-						logger.info("Attempting to launch using subprocess...")
-						subprocess.Popen([saleae_path])
-						time.sleep(retry_delay)
-					except Exception as subprocess_error:
-						logger.warning(f"Subprocess launch failed: {str(subprocess_error)}")
-						# Fall back to Saleae API launch
-						saleae = Saleae()
-						saleae.launch()
-
-					# Wait for the software to start
-					time.sleep(retry_delay)
-				except Exception as launch_error:
-					logger.error(f"Failed to launch Saleae Logic: {launch_error}")
-					time.sleep(retry_delay)
-					continue
+						# Try to launch the software using the found path
+						logger.info(f"Attempting to launch Saleae Logic from: {saleae_path}")
+						# Try to launch using subprocess first
+						try:
+							logger.info("Attempting to launch using subprocess...")
+							# Detached from our stdio so Logic's output cannot block it or corrupt the MCP stream
+							proc = subprocess.Popen(
+								[saleae_path],
+								stdin=subprocess.DEVNULL,
+								stdout=subprocess.DEVNULL,
+								stderr=subprocess.DEVNULL,
+								creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+							)
+							deadline = time.monotonic() + _LAUNCH_TIMEOUT
+						except Exception as subprocess_error:
+							logger.warning(f"Subprocess launch failed: {str(subprocess_error)}")
+							# Fall back to python-saleae's launcher; it is static, so no client is needed
+							Saleae.launch_logic(timeout=0)
+						launched = True
+					except Exception as launch_error:
+						logger.error(f"Failed to launch Saleae Logic: {launch_error}")
+
+				# Wait for the software to start, without sleeping past the launch deadline
+				delay = _backoff_delay(attempt, retry_delay)
+				if deadline is not None:
+					delay = max(0.0, min(delay, deadline - time.monotonic()))
+				time.sleep(delay)
 
 	logger.error("Failed to connect to Saleae Logic after all attempts.")
 	return None
@@ -0,0 +1,132 @@
+from typing import Optional, Dict, Any, Callable
+from collections import OrderedDict
+import functools
+import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Captures kept open by load_capture, least recently used first
+_MAX_CACHED_CAPTURES = 4
+_capture_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_capture_cache_lock = threading.Lock()
+# Saleae instance the cached captures were loaded through
+_capture_cache_owner = None
+
+def tool_errors(message: str, on_error: Optional[Callable[[], None]] = None):
+    """
+    Turn an exception escaping an MCP tool into a "<message>: <error>" error dict.
+
+    The traceback is logged once here; on_error, if given, runs before the dict is returned.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                logger.exception("MCP tool %s failed", fn.__name__)
+                if on_error is not None:
+                    on_error()
+                return {"status": "error", "message": f"{message}: {e}"}
+        return wrapper
+    return decorate
+
+class SharedSaleaeController:
+    """
+    One SaleaeController shared by the python-saleae tools, so the Logic connection and the
+    controller's capture/analyzer caches survive between tool calls.
+    """
+
+    def __init__(self, controller_class):
+        self._controller_class = controller_class
+        self._controller = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the shared SaleaeController, connecting it on first use or after a lost connection.
+
+        The controller's own methods swallow connection errors, so a Logic restart cannot be
+        left to drop(); ensure_connected() notices the closed socket and reconnects instead.
+        """
+        with self._lock:
+            if self._controller is None:
+                # SaleaeController connects on construction
+                self._controller = self._controller_class()
+            else:
+                self._controller.ensure_connected()
+            return self._controller
+
+    def drop(self):
+        """Mark the shared controller as disconnected so the next tool call reconnects."""
+        with self._lock:
+            if self._controller is not None:
+                self._controller.saleae = None
+
+def safe_stat(path: str) -> Optional[os.stat_result]:
+    """Stat path, returning None if it does not exist."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+def file_info(capture_file: str, st: Optional[os.stat_result] = None) -> Dict[str, Any]:
+    """File details for offline-mode responses, from a single stat call (or the one given)."""
+    if st is None:
+        st = os.stat(capture_file)
+    return {
+        "path": capture_file,
+        "format": "Saleae Logic (.sal)",
+        "size": st.st_size,
+        "modified": st.st_mtime
+    }
+
+def _close_captures(captures) -> None:
+    """Close captures dropped from the cache, so Logic does not keep them open."""
+    for capture in captures:
+        try:
+            capture.close()
+        except Exception as e:
+            logger.warning("Failed to close evicted capture: %s", e)
+
+def load_capture(saleae_instance, capture_file: str, st: Optional[os.stat_result] = None):
+    """
+    Load a capture through saleae_instance, reusing one loaded recently.
+
+    Keyed by the file's path, mtime and size, so a rewritten file loads afresh; the whole cache
+    is cleared when a reconnect hands in a different Saleae instance. st may pass in a stat
+    result the caller already has.
+    """
+    global _capture_cache_owner
+    if st is None:
+        st = os.stat(capture_file)
+    key = (os.path.abspath(capture_file), st.st_mtime_ns, st.st_size)
+    evicted = []
+    with _capture_cache_lock:
+        if saleae_instance is not _capture_cache_owner:
+            evicted.extend(_capture_cache.values())
+            _capture_cache.clear()
+            _capture_cache_owner = saleae_instance
+        capture = _capture_cache.get(key)
+        if capture is not None:
+            _capture_cache.move_to_end(key)
+    if capture is None:
+        # Loading talks to Logic, so keep it out of the lock and insert the result afterwards
+        capture = saleae_instance.load_capture(capture_file)
+        with _capture_cache_lock:
+            if saleae_instance is _capture_cache_owner:
+                cached = _capture_cache.get(key)
+                if cached is not None:
+                    # Another call loaded the same capture meanwhile; keep that one
+                    evicted.append(capture)
+                    capture = cached
+                    _capture_cache.move_to_end(key)
+                else:
+                    _capture_cache[key] = capture
+                    while len(_capture_cache) > _MAX_CACHED_CAPTURES:
+                        evicted.append(_capture_cache.popitem(last=False)[1])
+    # Closing talks to Logic too
+    _close_captures(evicted)
+    return capture
@@ -1,6 +1,6 @@
 import os
 import pytest
-from unittest.mock import Mock, patch, mock_open, ANY
+from unittest.mock import Mock, MagicMock, patch, mock_open, ANY
 from src.controllers.saleae_controller import SaleaeController
 
 @pytest.fixture
@@ -19,6 +19,29 @@ def saleae_controller(mock_saleae):
         controller.saleae = mock_saleae
         return controller
 
+@pytest.fixture
+def capture_file(tmp_path):
+    """Create a placeholder .logicdata capture and return its path."""
+    capture = tmp_path / 'capture.logicdata'
+    capture.write_bytes(b'\x00')
+    return str(capture)
+
+@pytest.fixture
+def export_csv(mock_saleae):
+    """Make export_data2 write the given CSV text; returns the list of export paths written."""
+    paths = []
+
+    def set_csv(text):
+        def mock_export(path, **kwargs):
+            paths.append(path)
+            with open(path, 'w') as f:
+                f.write(text)
+
+        mock_saleae.export_data2.side_effect = mock_export
+        return paths
+
+    return set_csv
+
 @pytest.fixture
 def sample_sal_file(tmp_path):
     """Create a sample .sal file for testing."""
@@ -151,4 +174,327 @@ def test_convert_sal_to_logicdata_api_error(saleae_controller, sample_sal_file,
         result = saleae_controller._convert_sal_to_logicdata(sample_sal_file, temp_logicdata_file)
         
         # Verify the result
-        assert result is False, "Conversion should return False on API error" 
\ No newline at end of file
+        assert result is False, "Conversion should return False on API error"
+
+
+def test_ensure_dir_creates_directory_once(saleae_controller, tmp_path):
+    """Test that _ensure_dir only hits the filesystem the first time for a directory."""
+    output_dir = str(tmp_path / 'exports')
+
+    with patch('os.makedirs') as mock_makedirs:
+        saleae_controller._ensure_dir(output_dir)
+        saleae_controller._ensure_dir(output_dir)
+
+    mock_makedirs.assert_called_once_with(output_dir, exist_ok=True)
+
+
+def test_wait_until_complete_backs_off(saleae_controller, mock_saleae):
+    """Test that _wait_until_complete polls with increasing delays until processing completes."""
+    mock_saleae.is_processing_complete.side_effect = [False, False, False, True]
+
+    with patch('time.sleep') as mock_sleep:
+        saleae_controller._wait_until_complete()
+
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert len(delays) == 3
+    assert delays == sorted(delays) and delays[0] < delays[-1]
+
+
+def test_wait_until_complete_timeout(saleae_controller, mock_saleae):
+    """Test that _wait_until_complete raises TimeoutError once the deadline passes."""
+    mock_saleae.is_processing_complete.return_value = False
+
+    with pytest.raises(TimeoutError, match="Export timed out"):
+        saleae_controller._wait_until_complete(0.01, "Export timed out")
+
+
+def test_find_saleae_software_uses_cached_path(saleae_controller, tmp_path, monkeypatch):
+    """Test that a previously resolved Logic path is reused without probing again."""
+    logic_exe = tmp_path / 'Logic.exe'
+    logic_exe.write_text('')
+    monkeypatch.setattr(SaleaeController, '_cached_saleae_path', str(logic_exe))
+
+    with patch('os.access') as mock_access:
+        assert saleae_controller._find_saleae_software() == str(logic_exe)
+
+    mock_access.assert_not_called()
+
+
+def test_get_digital_data_batch_maps_columns_by_header(saleae_controller, mock_saleae, capture_file,
+                                                      export_csv):
+    """Test that each channel gets its own transitions, matched to its column by the header."""
+    export_csv('Time[s], Channel 0, Channel 3\n0.0,0,1\n0.5,1,1\n1.0,1,0\n')
+
+    result = saleae_controller.get_digital_data_batch(capture_file, channels=[3, 0, 3])
+
+    assert result['status'] == 'success'
+    assert mock_saleae.export_data2.call_args.kwargs['digital_channels'] == [3, 0]
+    assert list(result['channels']) == [3, 0]
+    assert result['channels'][3] == [
+        {'time': 0.0, 'value': 1},
+        {'time': 1.0, 'value': 0}
+    ]
+    assert result['channels'][0] == [
+        {'time': 0.0, 'value': 0},
+        {'time': 0.5, 'value': 1}
+    ]
+
+
+def test_ensure_loaded_skips_reload_of_unchanged_file(saleae_controller, mock_saleae, capture_file):
+    """Test that an unchanged capture is loaded into Logic only once."""
+    saleae_controller._ensure_loaded(capture_file)
+    saleae_controller._ensure_loaded(capture_file)
+    assert mock_saleae.load_from_file.call_count == 1
+
+    # A new capture replaces whatever Logic had open
+    saleae_controller._invalidate_loaded()
+    saleae_controller._ensure_loaded(capture_file)
+    assert mock_saleae.load_from_file.call_count == 2
+
+
+def test_is_logic_running_checks_cached_pid_first(saleae_controller, monkeypatch):
+    """Test that a cached Logic PID avoids scanning the process table."""
+    monkeypatch.setattr('src.controllers.saleae_controller._LOGIC_PID', 1234)
+    logic_process = Mock()
+    logic_process.name.return_value = 'Logic.exe'
+
+    with patch('psutil.Process', return_value=logic_process) as mock_process, \
+         patch('psutil.process_iter') as mock_iter:
+        assert saleae_controller._is_logic_running()
+
+    mock_process.assert_called_once_with(1234)
+    mock_iter.assert_not_called()
+
+
+def test_wait_for_logic_api_returns_once_port_accepts(saleae_controller):
+    """Test that the startup probe stops as soon as the socket server answers."""
+    process = Mock()
+    process.poll.return_value = None
+
+    with patch('socket.create_connection', side_effect=[OSError, OSError, MagicMock()]) as mock_connect, \
+         patch('time.sleep') as mock_sleep:
+        assert saleae_controller._wait_for_logic_api(process)
+
+    assert mock_connect.call_count == 3
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.05, 0.1]
+
+
+def test_wait_for_logic_api_stops_when_process_exits(saleae_controller):
+    """Test that the startup probe gives up if Logic exits."""
+    process = Mock()
+    process.poll.return_value = 1
+
+    with patch('socket.create_connection') as mock_connect:
+        assert not saleae_controller._wait_for_logic_api(process)
+
+    mock_connect.assert_not_called()
+
+
+def test_configure_capture_sets_trigger(saleae_controller, mock_saleae):
+    """Test that a known trigger name is mapped onto the python-saleae Trigger enum."""
+    from saleae import Trigger
+
+    assert saleae_controller.configure_capture([0, 1], 1000000, trigger_channel=1, trigger_type='PosEdge')
+    mock_saleae.set_trigger_one_channel.assert_called_once_with(1, Trigger.Posedge)
+
+
+def test_parse_capture_reports_file_info(saleae_controller, tmp_path):
+    """Test that parse_capture reports size and times for a .logicdata file."""
+    capture_file = tmp_path / 'capture.logicdata'
+    capture_file.write_bytes(b'\x00' * 16)
+
+    result = saleae_controller.parse_capture(str(capture_file))
+
+    assert result['status'] == 'success'
+    assert result['file_size'] == 16
+    assert saleae_controller.parse_capture(str(tmp_path / 'missing.logicdata')) == {
+        "status": "error", "message": "File not found"
+    }
+
+
+def test_get_digital_data_reduces_transitions(saleae_controller, capture_file, export_csv):
+    """Test that max_samples keeps real edges, with high pulses visible and no repeated values."""
+    from itertools import pairwise
+    from src.controllers.saleae_controller import _transitions
+
+    export_csv('Time[s], Channel 0\n' + ''.join(f'{i}.0,{int(i == 5)}\n' for i in range(10)))
+
+    result = saleae_controller.get_digital_data(capture_file, channel=0, max_samples=3)
+
+    assert result['status'] == 'success'
+    # Transitions at 0.0 (low), 5.0 (high) and 6.0 (low) already fit within max_samples
+    assert result['data'] == [
+        {'time': 0.0, 'value': 0},
+        {'time': 5.0, 'value': 1},
+        {'time': 6.0, 'value': 0}
+    ]
+
+    # The pulse is kept at its own rising edge rather than moved to the block start
+    result = saleae_controller.get_digital_data(capture_file, channel=0, max_samples=2)
+    assert result['data'] == [
+        {'time': 0.0, 'value': 0},
+        {'time': 5.0, 'value': 1}
+    ]
+
+    reduced = _transitions([(f'{i}.0', str(i % 2)) for i in range(12)], max_samples=6)
+    assert len(reduced) <= 6
+    assert all(edge['value'] == int(edge['time']) % 2 for edge in reduced)
+    assert all(a['value'] != b['value'] for a, b in pairwise(reduced))
+
+
+def test_tune_socket_disables_nagle(saleae_controller, mock_saleae):
+    """Test that the python-saleae socket gets TCP_NODELAY."""
+    import socket
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        mock_saleae._s = sock
+        saleae_controller._tune_socket()
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+
+
+def test_find_saleae_software_caches_miss(saleae_controller, monkeypatch):
+    """Test that a failed lookup is not repeated within the negative-cache TTL."""
+    monkeypatch.setattr(SaleaeController, '_cached_saleae_path', None)
+    monkeypatch.setattr(SaleaeController, '_saleae_path_miss', None)
+
+    with patch('os.stat', side_effect=FileNotFoundError) as mock_stat:
+        assert saleae_controller._find_saleae_software() is None
+        probes = mock_stat.call_count
+        assert saleae_controller._find_saleae_software() is None
+
+    assert probes > 0
+    assert mock_stat.call_count == probes
+
+
+def test_start_capture_uses_capture_dir(saleae_controller, mock_saleae, tmp_path):
+    """Test that captures are written to the requested directory."""
+    assert saleae_controller.start_capture(1.0, capture_dir=str(tmp_path))
+
+    capture_file = mock_saleae.capture_to_file.call_args.args[0]
+    assert os.path.dirname(capture_file) == str(tmp_path)
+    assert capture_file.endswith('.logicdata')
+
+
+def test_export_data_rejects_empty_sal_file(saleae_controller, tmp_path):
+    """Test that an empty .sal input is reported before any conversion is attempted."""
+    sal_file = tmp_path / 'empty.sal'
+    sal_file.write_bytes(b'')
+
+    with patch.object(saleae_controller, 'connect', return_value=True), \
+         patch.object(saleae_controller, '_convert_sal_to_logicdata') as mock_convert:
+        result = saleae_controller.export_data(str(sal_file), str(tmp_path / 'out.csv'))
+
+    assert result['status'] == 'error'
+    assert result['message'] == 'Invalid file'
+    mock_convert.assert_not_called()
+
+
+def test_iter_digital_data_mcp_yields_chunks(saleae_controller, capture_file, export_csv):
+    """Test that the streaming reader splits the export into bounded chunks."""
+    export_paths = export_csv('Time[s], Channel 0\n0.0,0\n0.5,1\n1.0,0\n')
+
+    with patch.object(saleae_controller, 'connect', return_value=True):
+        chunks = list(saleae_controller.iter_digital_data_mcp(capture_file, [0], chunk_size=2))
+
+    assert [(chunk['i0'], chunk['i1']) for chunk in chunks] == [(0, 2), (2, 3)]
+    assert chunks[1] == {'status': 'chunk', 'i0': 2, 'i1': 3, 'time': [1.0], 'channels': {0: [0]}}
+    assert not os.path.exists(export_paths[0])
+
+
+def test_get_digital_data_mcp_pages_rows(saleae_controller, mock_saleae, capture_file, export_csv):
+    """Test that pages of rows come back column-wise from a capture loaded into Logic once."""
+    export_csv('Time[s], Channel 0, Channel 1\n0.0,0,1\n0.5,1,1\n1.0,0,1\n1.5,1,0\n2.0,0,0\n')
+
+    with patch.object(saleae_controller, 'connect', return_value=True):
+        first = saleae_controller.get_digital_data_mcp(capture_file, max_rows=2)
+        last = saleae_controller.get_digital_data_mcp(capture_file, [0], offset=3, max_rows=2)
+
+    assert first['data'] == {'time': [0.0, 0.5], 'channels': {0: [0, 1], 1: [1, 1]}}
+    assert first['next_offset'] == 2
+    assert last['data'] == {'time': [1.5, 2.0], 'channels': {0: [1, 0], 1: [0, 0]}}
+    assert last['next_offset'] is None
+    mock_saleae.load_from_file.assert_called_once()
+
+
+def test_temp_export_path_honours_saleae_tmpdir(tmp_path, monkeypatch):
+    """Test that temporary exports are unique files under SALEAE_TMPDIR."""
+    from src.controllers.saleae_controller import _temp_export_path
+
+    monkeypatch.setenv('SALEAE_TMPDIR', str(tmp_path))
+    first, second = _temp_export_path(), _temp_export_path()
+
+    assert first != second
+    assert os.path.dirname(first) == str(tmp_path).replace('\\', '/')
+    assert first.endswith('.csv')
+
+
+def test_temp_export_dir_prefers_roomy_shm(tmp_path, monkeypatch):
+    """Test that exports go to RAM-backed storage only when it is writable and has room."""
+    from src.controllers import saleae_controller as module
+
+    monkeypatch.delenv('SALEAE_TMPDIR', raising=False)
+    monkeypatch.setattr(module, '_SHM_DIR', str(tmp_path))
+    with patch('shutil.disk_usage', return_value=Mock(free=module._SHM_MIN_FREE_BYTES)):
+        assert module._temp_export_dir() == str(tmp_path)
+    with patch('shutil.disk_usage', return_value=Mock(free=module._SHM_MIN_FREE_BYTES - 1)):
+        assert module._temp_export_dir() == module.tempfile.gettempdir()
+
+    monkeypatch.setattr(module, '_SHM_DIR', str(tmp_path / 'missing'))
+    assert module._temp_export_dir() == module.tempfile.gettempdir()
+
+
+def test_detect_protocols_caches_analyzer_list(saleae_controller, mock_saleae, capture_file):
+    """Test that the analyzer list is requested from Logic once per connection."""
+    mock_saleae.get_available_analyzers.return_value = ['SPI', 'I2C']
+
+    first = saleae_controller.detect_protocols(capture_file)
+    second = saleae_controller.detect_protocols(capture_file)
+
+    assert first['status'] == second['status'] == 'success'
+    assert second['available_analyzers'] == ['SPI', 'I2C']
+    mock_saleae.get_available_analyzers.assert_called_once()
+
+
+def test_connect_forgets_loaded_capture(saleae_controller, mock_saleae, capture_file):
+    """Test that a new connection reloads the capture instead of trusting the old Logic state."""
+    saleae_controller._ensure_loaded(capture_file)
+
+    with patch('src.controllers.saleae_controller.Saleae', return_value=mock_saleae):
+        assert saleae_controller.connect()
+    saleae_controller._ensure_loaded(capture_file)
+
+    assert mock_saleae.load_from_file.call_count == 2
+
+
+def test_ensure_connected_reconnects_only_when_socket_closed(saleae_controller, mock_saleae):
+    """Test that a live Logic socket is reused and one closed by Logic triggers a reconnect."""
+    import socket
+
+    ours, logic = socket.socketpair()
+    mock_saleae._s = ours
+    try:
+        with patch.object(saleae_controller, 'connect', return_value=True) as mock_connect:
+            assert saleae_controller.ensure_connected()
+            mock_connect.assert_not_called()
+
+            logic.close()
+            assert saleae_controller.ensure_connected()
+            mock_connect.assert_called_once()
+    finally:
+        ours.close()
+        logic.close()
+
+
+def test_get_digital_data_removes_temp_file_on_failed_export(saleae_controller, mock_saleae,
+                                                            capture_file, tmp_path, monkeypatch):
+    """Test that a NAKed export does not leave its temporary CSV behind."""
+    export_dir = tmp_path / 'exports'
+    export_dir.mkdir()
+    monkeypatch.setenv('SALEAE_TMPDIR', str(export_dir))
+    mock_saleae.export_data2.side_effect = Exception('NAK')
+
+    single = saleae_controller.get_digital_data(capture_file, 0)
+    batch = saleae_controller.get_digital_data_batch(capture_file, [0, 1])
+
+    assert single['status'] == batch['status'] == 'error'
+    assert list(export_dir.iterdir()) == []
@@ -1,5 +1,6 @@
 import pytest
 import os
+from pathlib import Path
 from unittest.mock import Mock, patch, call
 from logic_analyzer_mcp.controllers.saleae_parser_controller import SaleaeParserController
 
@@ -24,6 +25,34 @@ def controller(mock_mcp):
     """Create a SaleaeParserController instance with a mock MCP."""
     return SaleaeParserController(mock_mcp)
 
+@pytest.fixture
+def capture_file(tmp_path):
+    """Create a placeholder .logicdata capture and return its path."""
+    capture = tmp_path / 'capture.logicdata'
+    capture.write_bytes(b'\x00')
+    return str(capture)
+
+@pytest.fixture
+def export_csv(controller):
+    """
+    Connect the controller to a mock Logic whose exports write the given CSV text;
+    returns the list of export paths written.
+    """
+    controller.saleae = Mock()
+    controller.saleae.is_processing_complete.return_value = True
+    paths = []
+
+    def set_csv(text):
+        def export(path, **kwargs):
+            paths.append(path)
+            Path(path).write_text(text)
+
+        controller.saleae.export_data2.side_effect = export
+        return paths
+
+    with patch.object(controller, '_ensure_connection'):
+        yield set_csv
+
 def test_parse_capture_file_with_logic_launch(controller, mock_mcp, mock_saleae):
     """Test parse_capture_file method when Logic software needs to be launched."""
     # Mock the initial connection failure and subsequent launch
@@ -440,4 +469,185 @@ def test_export_analog_data(controller, mock_mcp):
         start_time=0.0,
         end_time=1.0
     )
-    assert result == expected_result 
\ No newline at end of file
+    assert result == expected_result
+
+
+def test_ensure_loaded_skips_unchanged_capture(controller, tmp_path):
+    """Test that an unchanged .logicdata file is loaded into Logic only once."""
+    capture_file = tmp_path / 'capture.logicdata'
+    capture_file.write_bytes(b'\x00')
+    controller.saleae = Mock()
+    controller.saleae.is_processing_complete.return_value = True
+
+    controller._ensure_loaded(str(capture_file))
+    controller._ensure_loaded(str(capture_file))
+    assert controller.saleae.load_from_file.call_count == 1
+
+    # A rewritten file is loaded again
+    capture_file.write_bytes(b'\x00\x01')
+    controller._ensure_loaded(str(capture_file))
+    assert controller.saleae.load_from_file.call_count == 2
+
+
+def test_get_sal_capture_reuses_open_capture(controller, tmp_path):
+    """Test that Logic 2.x captures are reused and the least recently used is closed."""
+    controller.manager = Mock()
+    controller.manager.load_capture.side_effect = lambda path: Mock(name=path)
+    files = []
+    for i in range(controller.MAX_CACHED_CAPTURES + 1):
+        sal_file = tmp_path / f'capture{i}.sal'
+        sal_file.write_bytes(b'\x00')
+        files.append(str(sal_file))
+
+    first = controller._get_sal_capture(files[0])
+    assert controller._get_sal_capture(files[0]) is first
+    for sal_file in files[1:]:
+        controller._get_sal_capture(sal_file)
+
+    assert controller.manager.load_capture.call_count == len(files)
+    first.close.assert_called_once()
+
+
+def test_wait_complete_times_out(controller):
+    """Test that waiting on Logic processing gives up after the timeout."""
+    controller.saleae = Mock()
+    controller.saleae.is_processing_complete.return_value = False
+
+    with patch('time.sleep'), pytest.raises(TimeoutError):
+        controller._wait_complete(timeout=0)
+
+
+def test_read_csv_window_filters_time_range(tmp_path):
+    """Test that temporary exports are parsed column-wise and trimmed to the time range."""
+    from logic_analyzer_mcp.controllers.saleae_parser_controller import _read_csv_window
+    export_file = tmp_path / 'export.csv'
+    export_file.write_text('Time[s], Channel 0\n0.0,0\n0.5,1\n1.0,0\n1.5,1\n')
+
+    assert _read_csv_window(str(export_file), int, 0.5, 1.0, [0]) == ([0.5, 1.0], {0: [1, 0]})
+    assert len(_read_csv_window(str(export_file), float, None, None, [0])[0]) == 4
+    assert _read_csv_window(str(export_file), int, 0.75, None, [0]) == ([1.0, 1.5], {0: [0, 1]})
+    assert _read_csv_window(str(export_file), int, None, 0.25, [0]) == ([0.0], {0: [0]})
+
+    export_file.write_text('Time[s], Channel 0\n')
+    assert _read_csv_window(str(export_file), int, None, None, [0]) == ([], {0: []})
+
+
+def test_read_csv_window_maps_columns_by_header(tmp_path):
+    """Test that value columns are matched to channels by the header, not by position."""
+    from logic_analyzer_mcp.controllers.saleae_parser_controller import _read_csv_window
+    export_file = tmp_path / 'export.csv'
+    export_file.write_text('Time[s], Channel 3, Channel 0\n0.0,1,0\n0.5,0,1\n')
+
+    assert _read_csv_window(str(export_file), int, None, None, [0, 3]) == (
+        [0.0, 0.5], {3: [1, 0], 0: [0, 1]}
+    )
+
+
+def test_get_digital_data_return_format(controller, capture_file, export_csv):
+    """Test that digital data is columnar by default and records on request."""
+    export_csv('Time[s], Channel 0\n0.0,0\n0.5,1\n')
+
+    soa = controller.get_digital_data(capture_file=capture_file)
+    aos = controller.get_digital_data(capture_file=capture_file, return_format='aos')
+
+    assert soa['data'] == {'time': [0.0, 0.5], 'value': [0, 1]}
+    assert aos['data'] == [{'time': 0.0, 'value': 0}, {'time': 0.5, 'value': 1}]
+
+
+def test_get_analog_data_exports_only_the_window(controller, capture_file, export_csv):
+    """Test that a bounded time range is passed to Logic so only the window is exported."""
+    export_csv('Time[s], Channel 0\n0.5,1.25\n')
+
+    result = controller.get_analog_data(capture_file=capture_file, start_time=0.5, end_time=1.0)
+
+    assert result['data'] == {'time': [0.5], 'value': [1.25]}
+    assert controller.saleae.export_data2.call_args.kwargs['time_span'] == [0.5, 1.0]
+
+
+def test_get_digital_data_removes_temp_file_on_error(controller, capture_file, export_csv):
+    """Test that the temporary export is unique and removed even when parsing fails."""
+    exported = export_csv('Time[s], Channel 0\n0.0,not-a-number\n')
+
+    result = controller.get_digital_data(capture_file=capture_file)
+
+    assert result['status'] == 'error'
+    assert os.path.isabs(exported[0])
+    assert not os.path.exists(exported[0])
+
+
+def test_get_digital_data_multi_exports_once(controller, capture_file, export_csv):
+    """Test that several channels come from a single load and a single combined export."""
+    export_csv('Time[s], Channel 0, Channel 2\n0.0,0,1\n0.5,1,1\n1.0,1,0\n')
+
+    result = controller.get_digital_data_multi(capture_file=capture_file, channels=[2, 0, 2])
+
+    assert result['status'] == 'success'
+    assert result['data'] == {
+        0: {'time': [0.0, 0.5], 'value': [0, 1]},
+        2: {'time': [0.0, 1.0], 'value': [1, 0]},
+    }
+    controller.saleae.load_from_file.assert_called_once()
+    controller.saleae.export_data2.assert_called_once()
+    assert controller.saleae.export_data2.call_args.kwargs['digital_channels'] == [0, 2]
+
+
+def test_apis_connect_lazily(mock_mcp):
+    """Test that constructing the controller does not connect to Logic until an API is used."""
+    module = 'logic_analyzer_mcp.controllers.saleae_parser_controller'
+    with patch(f'{module}.Saleae') as saleae_cls, patch(f'{module}.Manager') as manager_cls:
+        controller = SaleaeParserController(mock_mcp)
+        saleae_cls.assert_not_called()
+        manager_cls.connect.assert_not_called()
+
+        assert controller.saleae is saleae_cls.return_value
+        assert controller.saleae is saleae_cls.return_value
+        saleae_cls.assert_called_once()
+        manager_cls.connect.assert_not_called()
+
+
+def test_check_file_format_cache(controller, tmp_path):
+    """Test that checked formats are cached, bounded and still reject missing files."""
+    controller.MAX_CACHED_FORMATS = 2
+    paths = []
+    for i in range(3):
+        capture_file = tmp_path / f'capture{i}.logicdata'
+        capture_file.write_bytes(b'\x00')
+        paths.append(str(capture_file))
+        assert controller._check_file_format(str(capture_file)) == 'logicdata'
+
+    assert list(controller._format_cache) == [os.path.abspath(p) for p in paths[1:]]
+
+    os.remove(paths[2])
+    with pytest.raises(ValueError, match="File does not exist"):
+        controller._check_file_format(paths[2])
+
+
+def test_get_analog_data_packed(controller, capture_file, export_csv):
+    """Test that packed analog data decodes back to the exported samples."""
+    import array
+    import base64
+    export_csv('Time[s], Channel 0\n0.0,1.5\n0.5,-2.25\n')
+
+    data = controller.get_analog_data(capture_file=capture_file, return_format='packed')['data']
+
+    assert data['dtype'] == {'time': 'float64', 'value': 'float64'}
+    assert data['length'] == 2
+    assert array.array('d', base64.b64decode(data['time'])).tolist() == [0.0, 0.5]
+    assert array.array('d', base64.b64decode(data['value'])).tolist() == [1.5, -2.25]
+
+
+def test_ensure_connection_launches_logic_when_socket_is_down(mock_mcp):
+    """Test that Logic is launched and probed when its scripting socket is closed."""
+    module = 'logic_analyzer_mcp.controllers.saleae_parser_controller'
+    with patch(f'{module}.Saleae') as saleae_cls, \
+         patch(f'{module}._logic_socket_up', side_effect=[False, False, True]), \
+         patch('time.sleep'):
+        controller = SaleaeParserController(mock_mcp)
+        controller._ensure_connection('logicdata')
+
+        saleae_cls.launch_logic.assert_called_once_with(timeout=0)
+        assert controller.saleae is saleae_cls.return_value
+
+        # A live session is reused without probing or launching again
+        controller._ensure_connection('logicdata')
+        saleae_cls.launch_logic.assert_called_once()